@@ -1,31 +1,45 @@
 # ========== Standard Library ==========
+import inspect
+import itertools
 import os
+import sys
+import threading
 import time
-from io import BytesIO
+from collections import Counter
 from datetime import datetime
-import concurrent.futures
-import tempfile
 
 # ========== Third-Party Libraries ==========
 import gradio as gr
-import pandas as pd
-import spacy
-from sentence_transformers import SentenceTransformer
 
 # ========== Local Modules ==========
-from jd_parser.extractor import extract_text_from_pdf, extract_text_from_docx, extract_text_from_txt
 from jd_parser.field_extractor import extract_fields_from_text
 from jd_parser.skill_matcher import match_skills
-from resume_matcher.matcher import compare_jd_resume
+from resume_matcher.matcher import build_jd_profile
+from resume_matcher.batch_scoring import BatchScores, resume_row, duplicate_row, fanout_row
 from resume_matcher.multi_jd_matcher import compare_multiple_jds_resumes
+from utils.exporter import StreamingExporter, EXPORT_DIR, EXPORT_TTL, discard_export, sweep_exports
+from utils.ingest import iter_documents, extract_text as extract_document
+from utils.nlp_batch import annotate_batch, ANNOTATIONS, BATCH_SIZE
+from utils.pipeline import StreamingPipeline, MemoryBudget, MEMORY_BUDGET_MB, TOP_K
+from utils.dedup import DuplicateIndex, DEDUP_ENABLED
+from utils.budget import LatencyBudget, DEFAULT_LATENCY_BUDGET
+from resume_matcher.utils import extract_mobile, extract_email
+from utils.models import warm_up_models
+from utils.profiling import profiled, profile_note, PROFILE_UI
 
 # ========== Environment Setup ==========
-nlp = spacy.load("en_core_web_sm")
-model = SentenceTransformer("all-mpnet-base-v2", device="cpu")
-model.encode(["SmartScreen.AI Warm-up"], convert_to_tensor=True)
+# Taxonomy maps, regexes and the role matrix come from the precompiled startup
+# artifact (python -m utils.artifact build); sentence transformers load lazily.
 
 # ========== Global State ==========
-current_data = []
+EXPORT_FORMAT = os.getenv("SMARTSCREEN_EXPORT_FORMAT", "xlsx")
+MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+# Stream every row to the export file as it is scored; off = export only the retained top-k
+SPILL_TO_DISK = os.getenv("SMARTSCREEN_SPILL", "1") != "0"
+RANKED_SHEET = "Top Matches"
+SPILL_SHEET = "All Resumes (unsorted)"   # rows in completion order, written while scoring
+# A CSV is one flat table: when it already holds every spilled row, a ranked copy would repeat the top-k
+RANKED_COPY = not (SPILL_TO_DISK and EXPORT_FORMAT == "csv")
 excel_ready = gr.State(value=False)
 
 # ========== Utility Functions ==========
@@ -33,26 +47,9 @@ def clean_skills(raw_skills):
     return sorted(set(s.strip().title() for s in raw_skills))
 
 def extract_text(file):
-    ext = os.path.splitext(file.name)[-1].lower()
-    try:
-        raw_bytes = file.read() if not os.path.exists(file.name) else open(file.name, "rb").read()
-        if not raw_bytes:
-            return "❌ Failed to read file: File stream is empty."
-
-        if ext == ".pdf":
-            text = extract_text_from_pdf(BytesIO(raw_bytes))
-        elif ext == ".docx":
-            text = extract_text_from_docx(BytesIO(raw_bytes))
-        elif ext == ".txt":
-            text = extract_text_from_txt(BytesIO(raw_bytes))
-        else:
-            return "❌ Unsupported file type"
-
-        return text
-
-    except Exception as e:
-        return f"❌ Failed to read file: {str(e)}"
-    
+    text, error = extract_document(file)
+    return error or text
+
 def process_jd(input_mode, file, text_input):
     if input_mode == "Upload File" and file:
         text = extract_text(file)
@@ -84,73 +81,205 @@ def process_jd(input_mode, file, text_input):
 
 
 # ========== Main JD vs Resumes Matching ==========
-def compare_jd_multiple_resumes(jd_file, resume_files):
-    global current_data
+def render_row(record):
+    return [
+        record.name,
+        record.mobile,
+        # ✅ "75% weighted (🛠️+📌 = 3.0 / 4)", plus a note when a cheaper matching tier was used
+        f"{record.match_summary} · {record.tier_note}" if record.tier_note else record.match_summary,
+        f"{record.shortlist} · {record.duplicate_note}" if record.duplicate_of else record.shortlist,
+        record.matched_display(),
+        ", ".join(record.gaps)
+    ]
+
+@profiled("single-jd")
+def compare_jd_multiple_resumes(jd_file, resume_files, time_budget=None, profile=False, previous_export=None):
+    # ✅ A session keeps only its latest export; abandoned ones expire after EXPORT_TTL
+    discard_export(previous_export)
+    sweep_exports()
     if not jd_file or not resume_files:
-        return [["❌ JD or Resumes missing", "", "", "", "", ""]], ""
+        return [["❌ JD or Resumes missing", "", "", "", "", ""]], "", None
 
     jd_text = extract_text(jd_file)
     if jd_text.startswith("❌"):
-        return [[jd_text, "", "", "", "", ""]], ""
-
-    resume_files = resume_files if isinstance(resume_files, list) else [resume_files]
-
-    def process_resume(resume_file):
-        resume_text = extract_text(resume_file)
-
-        if resume_text.startswith("❌"):
-            return [os.path.basename(resume_file.name), "❌ Error", "", "", "", "🔴 Reject", 0]
-
-        result = compare_jd_resume(jd_text, resume_text)
-
+        return [[jd_text, "", "", "", "", ""]], "", None
+
+    # ✅ Under a latency budget later resumes drop to cheaper matching tiers
+    latency = LatencyBudget(DEFAULT_LATENCY_BUDGET if time_budget is None else time_budget)
+    jd_profile = build_jd_profile(jd_text)
+
+    # ✅ ingest → extract → dedup → analyze → score → top-k sink, joined by bounded queues.
+    # Extracted text counts against the memory budget until it has been scored,
+    # so peak memory no longer grows with the number of uploaded resumes.
+    budget = MemoryBudget(MEMORY_BUDGET_MB * 1024 * 1024)
+    pipeline = StreamingPipeline()
+    duplicates = DuplicateIndex()
+    sequence = itertools.count()
+
+    def extract(document):
+        text, error = extract_document(document)
+        if error:
+            return document.name, None, 0
+        size = sys.getsizeof(text)
+        if not budget.acquire(size, pipeline.cancelled):
+            return None
+        return document.name, text, size
+
+    def dedup(item):
+        # Keys carry a sequence number: two uploads can share a file name
+        name, text, size = item
+        key = (next(sequence), name)
+        if text is None:
+            latency.finished()  # failed extraction: nothing left to score
+            return key, None, 0, None
+        if not DEDUP_ENABLED:
+            return key, text, size, None
+        representative = duplicates.find_or_add(key, text)
+        if representative is None:
+            return key, text, size, None
+        # ✅ Near-duplicate: never scored, it reuses the representative's score
+        duplicate = (representative, extract_mobile(text), extract_email(text))
+        budget.release(size)
+        latency.finished()
+        return key, None, 0, duplicate
+
+    def analyze(batch):
+        # One nlp.pipe pass per micro-batch; score() then reads the cached annotations
+        annotate_batch([text for _, text, _, _ in batch if text])
+        return batch
+
+    def score(item):
+        key, text, size, duplicate = item
+        if text is None:
+            return key, None, duplicate
         try:
-            percent_value = round((result["weighted_score"] / result["total_skills"]) * 100)
-        except:
-            percent_value = 0
-
-        return [
-            os.path.basename(resume_file.name),
-            result["mobile"],
-            result["match_summary"],  # ✅ Now includes "75% weighted (🛠️+📌 = 3.0 / 4)"
-            result["shortlist"],
-            ", ".join([
-                f"🛠️ {skill}" if result["skill_justification"].get(skill, {}).get("tag") == "🛠️ Strong Mention"
-                else f"📌 {skill}" if result["skill_justification"].get(skill, {}).get("tag") == "📌 Weak Mention"
-                else skill
-                for skill in result["strengths"]
-            ]),
-            ", ".join(result["gaps"]),
-            percent_value  # for sorting
-        ]
+            return key, resume_row(jd_profile, key[1], text, tier=latency.tier()), None
+        finally:
+            ANNOTATIONS.discard(text)
+            budget.release(size)
+            latency.finished()
+
+    def ingest():
+        for document in iter_documents(resume_files):
+            latency.expect()
+            yield document
+
+    pipeline.stage(extract, workers=MAX_WORKERS)
+    pipeline.stage(dedup)
+    pipeline.batch_stage(analyze, batch_size=BATCH_SIZE)
+    pipeline.stage(score, workers=MAX_WORKERS)
 
     start = time.time()
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        results = list(executor.map(process_resume, resume_files))
+    top = None      # BatchScores holding the running top-k, best first
+    rows = []       # scored rows waiting to be weighted as one columnar batch
+    buckets = Counter()
+    tiers = Counter()
+    seen = 0
+    failed = []
+    failed_count = 0
+    duplicate_count = 0
+    scored = {}     # representative key → fanout_row (name, tags, tier; no evidence sentences)
+    waiting = {}    # representative key → duplicates that arrived before it was scored
+
+    def flush():
+        # ✅ Weighting, bucketing and top-k selection run on arrays, once per batch
+        nonlocal top, seen
+        if not rows:
+            return
+        batch = BatchScores.from_rows(jd_profile.skill_ids, rows)
+        rows.clear()
+        seen += len(batch)
+        buckets.update(batch.bucket_counts())
+        tiers.update(batch.tier_counts())
+        if SPILL_TO_DISK:
+            exporter.write_batch(SPILL_SHEET, batch)
+        merged = BatchScores.concat([top, batch])
+        top = merged.take(merged.top_k(TOP_K))
+
+    def keep(row):
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            flush()
+
+    with StreamingExporter(fmt=EXPORT_FORMAT) as exporter:
+        if RANKED_COPY:
+            exporter.add_sheet(RANKED_SHEET)   # first sheet, filled once the ranking is final
+        # ✅ Archives are expanded lazily; only the top-k rows and counts are kept
+        for key, row, duplicate in pipeline.run(ingest()):
+            resume_name = key[1]
+            if duplicate is not None:
+                duplicate_count += 1
+                representative, mobile, email = duplicate
+                if representative in scored:
+                    keep(duplicate_row(scored[representative], resume_name, mobile, email))
+                else:
+                    waiting.setdefault(representative, []).append((resume_name, mobile, email))
+            elif row is None:
+                failed_count += 1
+                if len(failed) < TOP_K:
+                    failed.append(resume_name)
+                if SPILL_TO_DISK:
+                    exporter.write_error(SPILL_SHEET, resume_name, "❌ Error")
+            else:
+                if key in duplicates:
+                    scored[key] = fanout_row(row)
+                keep(row)
+                for resume_name, mobile, email in waiting.pop(key, ()):
+                    keep(duplicate_row(row, resume_name, mobile, email))
+        flush()
+
+        ranked = top.share_evidence().records() if top is not None else []
+        if RANKED_COPY:
+            for record in ranked:
+                exporter.write_record(RANKED_SHEET, record)
+            for resume_name in failed:
+                exporter.write_error(RANKED_SHEET, resume_name, "❌ Error")
     elapsed = time.time() - start
 
-    sorted_results = sorted(results, key=lambda x: x[-1], reverse=True)
-    current_data = [r[:-1] for r in sorted_results]
-
-    return current_data, f"✅ Ranked {len(current_data)} resumes in {elapsed:.2f} seconds"
+    grid = [render_row(r) for r in ranked] + [
+        [name, "❌ Error", "", "", "", "🔴 Reject"] for name in failed
+    ]
+
+    total = seen + failed_count
+    status = f"✅ Ranked {total} resumes in {elapsed:.2f} seconds"
+    if buckets:
+        status += " (" + ", ".join(f"{label}: {count}" for label, count in buckets.most_common()) + ")"
+    if duplicate_count:
+        status += f" · 🔁 {duplicate_count} near-duplicates reused an earlier score"
+    quality_note = latency.describe(tiers)
+    if quality_note:
+        status += f" · {quality_note}"
+    if profile_note():
+        status += f" · {profile_note()}"
+    if len(grid) < total:
+        status += f" · showing top {len(ranked)}"
+        if SPILL_TO_DISK and RANKED_COPY:
+            status += f"; every row is in the export's \"{SPILL_SHEET}\" sheet"
+        elif SPILL_TO_DISK:
+            status += "; every row is in the CSV export"
+    return grid, status, exporter.path
+
+def compare_multiple_jds_with_export(jd_files, resume_files, time_budget=None, profile=False, previous_export=None):
+    discard_export(previous_export)
+    sweep_exports()
+    html, status, export_path = compare_multiple_jds_resumes(
+        jd_files, resume_files, export_format=EXPORT_FORMAT,
+        time_budget=DEFAULT_LATENCY_BUDGET if time_budget is None else time_budget, profile=profile
+    )
+    return html, status, gr.update(value=export_path, visible=bool(export_path)), export_path
 
 # ========== Excel Export ==========
-def generate_excel_download():
-    if not current_data:
+def generate_excel_download(export_path):
+    if not export_path or not os.path.exists(export_path):
         return gr.update(value=None, visible=False)
 
-    df = pd.DataFrame(current_data, columns=[
-        "Resume", "Mobile", "Match %", "Shortlist", "JD Skills Matched", "Gaps"
-    ])
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-        with pd.ExcelWriter(tmp.name, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name="Top Matches")
-        tmp_path = tmp.name
-
-    return gr.update(value=tmp_path, visible=True)
+    return gr.update(value=export_path, visible=True)
 
 # ========== Gradio UI ==========
-with gr.Blocks(title="SmartScreen.AI") as main_app:
+# Gradio copies served exports into its own cache; expire those copies too (newer Gradio only)
+BLOCKS_OPTIONS = {"delete_cache": (EXPORT_TTL, EXPORT_TTL)} if "delete_cache" in inspect.signature(gr.Blocks).parameters else {}
+
+with gr.Blocks(title="SmartScreen.AI", **BLOCKS_OPTIONS) as main_app:
     # 🚀 Loading Splash
     gr.Markdown("""
     <div style='text-align: center; padding: 20px; font-size: 28px; font-weight: bold; color: #FF6600;'>
@@ -169,7 +298,10 @@ with gr.Blocks(title="SmartScreen.AI") as main_app:
                 gr.Markdown("### Single JD vs multiple resumes ranking")
 
                 jd_file = gr.File(label="📁 Upload JD", file_types=[".pdf", ".docx", ".txt"])
-                resume_files = gr.File(label="📄 Upload Resumes", file_types=[".pdf", ".docx", ".txt"], file_count="multiple")
+                resume_files = gr.File(label="📄 Upload Resumes (files or ZIP)", file_types=[".pdf", ".docx", ".txt", ".zip"], file_count="multiple")
+                time_budget = gr.Number(label="⏱️ Time budget in seconds (0 = best quality, no limit)", value=DEFAULT_LATENCY_BUDGET, minimum=0)
+                # 🧪 Hidden unless SMARTSCREEN_PROFILE_UI=1
+                profile_run = gr.Checkbox(label="🧪 Profile this run", value=False, visible=PROFILE_UI)
                 compare_btn = gr.Button("🔍 Compare and Rank", variant="primary")
 
                 result_grid = gr.Dataframe(
@@ -183,10 +315,16 @@ with gr.Blocks(title="SmartScreen.AI") as main_app:
                     icon="https://cdn-icons-png.flaticon.com/512/732/732220.png"
                 )
                 download_btn = gr.DownloadButton(label="⬇️ Click to Download", visible=False)
-
-                generate_btn.click(fn=generate_excel_download, inputs=[], outputs=[download_btn])
-                compare_btn.click(fn=compare_jd_multiple_resumes, inputs=[jd_file, resume_files], outputs=[result_grid, status_message])
-                download_btn.click(fn=generate_excel_download, inputs=[], outputs=[download_btn])
+                # Per-session export path: one recruiter's button never serves another's file
+                export_state = gr.State(value=None)
+
+                generate_btn.click(fn=generate_excel_download, inputs=[export_state], outputs=[download_btn])
+                compare_btn.click(
+                    fn=compare_jd_multiple_resumes,
+                    inputs=[jd_file, resume_files, time_budget, profile_run, export_state],
+                    outputs=[result_grid, status_message, export_state]
+                )
+                download_btn.click(fn=generate_excel_download, inputs=[export_state], outputs=[download_btn])
 
                 jd_file.change(fn=lambda: gr.update(visible=False), inputs=[], outputs=[download_btn])
                 resume_files.change(fn=lambda: gr.update(visible=False), inputs=[], outputs=[download_btn])
@@ -202,17 +340,21 @@ with gr.Blocks(title="SmartScreen.AI") as main_app:
                 gr.Markdown("### Bulk JD vs resumes ranking")
 
                 jd_files_multi = gr.File(label="📁 Upload JDs", file_types=[".pdf", ".docx", ".txt"], file_count="multiple")
-                resume_files_multi = gr.File(label="📄 Upload Resumes", file_types=[".pdf", ".docx", ".txt"], file_count="multiple")
+                resume_files_multi = gr.File(label="📄 Upload Resumes (files or ZIP)", file_types=[".pdf", ".docx", ".txt", ".zip"], file_count="multiple")
+                time_budget_multi = gr.Number(label="⏱️ Time budget in seconds (0 = best quality, no limit)", value=DEFAULT_LATENCY_BUDGET, minimum=0)
+                profile_run_multi = gr.Checkbox(label="🧪 Profile this run", value=False, visible=PROFILE_UI)
 
                 compare_all_btn = gr.Button("🔍 Compare All (JDs × Resumes) and Rank", variant="primary")
 
                 results_html = gr.HTML()
                 compare_all_status = gr.Markdown()
+                download_multi_btn = gr.DownloadButton(label="⬇️ Download All Results", visible=False)
+                export_state_multi = gr.State(value=None)
 
                 compare_all_btn.click(
-                    fn=compare_multiple_jds_resumes,
-                    inputs=[jd_files_multi, resume_files_multi],
-                    outputs=[results_html, compare_all_status]
+                    fn=compare_multiple_jds_with_export,
+                    inputs=[jd_files_multi, resume_files_multi, time_budget_multi, profile_run_multi, export_state_multi],
+                    outputs=[results_html, compare_all_status, download_multi_btn, export_state_multi]
                 )
                  # ✅ Icon Legend
                 gr.Markdown("""
@@ -236,7 +378,7 @@ with gr.Blocks(title="SmartScreen.AI") as main_app:
                 # 🔐 Data Privacy Note
             gr.Markdown("""
                     <div style='background-color:#f0f0f0; padding:10px; border-radius:8px; text-align:center; font-weight:bold; color:#333; font-size:15px;'>
-                    🔐 All files are processed securely in-memory and never saved or stored.
+                    🔐 Uploaded files are processed in-memory and never stored. Ranking exports are kept privately only until your next run and deleted within an hour.
                     </div>
                 """)
                  
@@ -251,5 +393,18 @@ with gr.Blocks(title="SmartScreen.AI") as main_app:
     )
 
 # ========== Launch ==========
-main_app.launch(server_name="0.0.0.0", server_port=7860)
-
+SERVER_PORT = int(os.getenv("SMARTSCREEN_PORT", "7860"))
+WORKERS = int(os.getenv("SMARTSCREEN_WORKERS", "1"))
+
+if __name__ == "__main__":
+    if WORKERS > 1:
+        # Preload-then-fork: worker i serves on SERVER_PORT + i. Routing to those ports
+        # needs an external sticky load balancer (see README, "Multi-worker mode")
+        from utils.prefork import serve_forked
+        print(f"⚠️ {WORKERS} workers on ports {SERVER_PORT}-{SERVER_PORT + WORKERS - 1}: "
+              "only worker 0 gets traffic unless a sticky load balancer spreads it")
+        serve_forked(lambda i: main_app.launch(server_name="0.0.0.0", server_port=SERVER_PORT + i, allowed_paths=[EXPORT_DIR]), WORKERS)
+    else:
+        # Serve immediately; the transformers finish loading in the background
+        threading.Thread(target=warm_up_models, name="model-warmup", daemon=True).start()
+        main_app.launch(server_name="0.0.0.0", server_port=SERVER_PORT, allowed_paths=[EXPORT_DIR])
@@ -1,5 +1,7 @@
+import zipfile
+from xml.etree import ElementTree
+
 import pdfplumber
-from docx import Document
 
 
 def extract_text_from_pdf(file_stream):
@@ -9,7 +11,81 @@ def extract_text_from_pdf(file_stream):
             text += page.extract_text() or ""
     return text.strip()
 
-def extract_text_from_docx(file_like_obj):
+# ========== DOCX ==========
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_P, _T, _TAB, _BR, _CR = _W + "p", _W + "t", _W + "tab", _W + "br", _W + "cr"
+_TBL, _TR, _TC, _BODY = _W + "tbl", _W + "tr", _W + "tc", _W + "body"
+# Text boxes come twice: DrawingML in mc:Choice and a VML copy in mc:Fallback
+_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+
+def _iter_docx_lines(file_like_obj):
+    """
+    Stream-parses word/document.xml and yields paragraphs and table rows in
+    document order, so tables stay next to the section they belong to.
+    Paragraphs nested in text boxes are yielded on their own, before the
+    paragraph that anchors them.
+    """
+    with zipfile.ZipFile(file_like_obj) as zf:
+        with zf.open("word/document.xml") as xml_stream:
+            body = None
+            table_depth = 0
+            fallback_depth = 0
+            paragraphs = []   # one parts list per open (possibly nested) paragraph
+            cell_paras = []
+            row_cells = []
+
+            for event, elem in ElementTree.iterparse(xml_stream, events=("start", "end")):
+                tag = elem.tag
+                if tag == _FALLBACK:
+                    fallback_depth += 1 if event == "start" else -1
+                    continue
+                if fallback_depth:
+                    continue
+
+                if event == "start":
+                    if tag == _P:
+                        paragraphs.append([])
+                    elif tag == _TBL:
+                        table_depth += 1
+                    elif tag == _BODY:
+                        body = elem
+                    continue
+
+                parts = paragraphs[-1] if paragraphs else []
+                if tag == _T:
+                    parts.append(elem.text or "")
+                elif tag == _TAB:
+                    parts.append("\t")
+                elif tag in (_BR, _CR):
+                    parts.append("\n")
+                elif tag == _P:
+                    para_text = "".join(paragraphs.pop()).strip()
+                    if table_depth:
+                        cell_paras.append(para_text)
+                    elif para_text:
+                        yield para_text
+                elif tag == _TC and table_depth == 1:
+                    row_cells.append("\n".join(p for p in cell_paras if p).strip())
+                    cell_paras = []
+                elif tag == _TR and table_depth == 1:
+                    row_text = " | ".join(cell for cell in row_cells if cell)
+                    row_cells = []
+                    if row_text:
+                        yield row_text
+                elif tag == _TBL:
+                    table_depth -= 1
+                else:
+                    continue
+
+                # ✅ Drop finished top-level blocks so memory stays flat on large resumes
+                if table_depth == 0 and not paragraphs and tag in (_P, _TBL) and body is not None:
+                    body.clear()
+
+
+def _extract_docx_with_python_docx(file_like_obj):
+    from docx import Document
+
     doc = Document(file_like_obj)
     lines = []
 
@@ -27,5 +103,14 @@ def extract_text_from_docx(file_like_obj):
 
     return "\n".join(lines)
 
+
+def extract_text_from_docx(file_like_obj):
+    try:
+        return "\n".join(_iter_docx_lines(file_like_obj))
+    except (KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        # Fallback: non-standard package layout, let python-docx resolve it
+        file_like_obj.seek(0)
+        return _extract_docx_with_python_docx(file_like_obj)
+
 def extract_text_from_txt(file_like_obj):
     return file_like_obj.read().decode("utf-8", errors="ignore")
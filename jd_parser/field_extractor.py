@@ -1,25 +1,26 @@
-import re
-import spacy
-import json
+from utils.artifact import get_artifact
+from utils.models import get_nlp, model_labels
 
-# Load spaCy model once
-nlp = spacy.load("en_core_web_sm")
+# NER labels come from the model's meta; the NER-only pipeline for the role
+# fallback is loaded only if the model can actually tag job titles
+NER_LABELS = model_labels(component="ner")
 
-# Load unified config file with labels + patterns
-with open("config/field_config.json", "r") as f:
-    FIELD_CONFIG = json.load(f)
+# Unified labels + patterns, precompiled in the startup artifact
+# (labels lowercased, patterns compiled with re.IGNORECASE)
+FIELD_CONFIG = get_artifact()["field_config"]
 
 # 🔍 Hybrid extraction function
 def extract_field(text: str, labels: list, patterns: list):
     for line in text.split("\n"):
-        for kw in labels:
-            if kw.lower() in line.lower():
-                for pattern in patterns:
-                    match = re.search(pattern, line.strip(), re.IGNORECASE)
-                    if match:
-                        return _extract_value(match)
+        line_lower = line.lower()
+        if any(kw in line_lower for kw in labels):
+            stripped = line.strip()
+            for pattern in patterns:
+                match = pattern.search(stripped)
+                if match:
+                    return _extract_value(match)
     for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = pattern.search(text)
         if match:
             return _extract_value(match)
     return None
@@ -35,11 +36,12 @@ def extract_role(text):
     if role_line:
         return role_line.strip().title()
 
-    # spaCy fallback (Job Title entities)
-    doc = nlp(text)
-    for ent in doc.ents:
-        if ent.label_ == "JOB_TITLE":
-            return ent.text.title()
+    # spaCy fallback (Job Title entities) — skipped when the model has no such label
+    if "JOB_TITLE" in NER_LABELS:
+        doc = get_nlp(task="entities")(text)
+        for ent in doc.ents:
+            if ent.label_ == "JOB_TITLE":
+                return ent.text.title()
 
     return None
 
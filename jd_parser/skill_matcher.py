@@ -1,19 +1,24 @@
 # jd_parser/skill_matcher.py
 
 import re
-import spacy
-from sentence_transformers import SentenceTransformer, util
-from config.skills import ROLE_BASED_SKILLS, SYNONYM_MAP
-from resume_matcher.skill_helpers import normalize_skill  # ✅ FIXED: No circular import
+import numpy as np
+from utils.artifact import get_artifact, build_skill_index
+from utils.models import get_nlp, get_sentence_model, get_embedding_table, encode_normalized, MINILM_MODEL
+from utils.nlp_batch import register_task, annotation
 
-# Load spaCy model once
-nlp = spacy.load("en_core_web_sm")
+# Tokenizer-only pipeline: stop words and punctuation are lexical attributes
+nlp = get_nlp(task="tokens")
 
-# Build list of all known skills from ROLE_BASED_SKILLS
-ALL_KNOWN_SKILLS = sorted({skill for skills in ROLE_BASED_SKILLS.values() for skill in skills})
+# Known skills and their lookup indexes come precompiled from the startup artifact
+_artifact = get_artifact()
+ALL_KNOWN_SKILLS = _artifact["known_skills"]
+_SKILL_INDEX = _artifact["skill_index"]        # (token → skills, [(skill, multi-word norm)])
+_SYNONYM_INDEX = _artifact["synonym_index"]    # (token → canonicals, [(canonical, multi-word variant)])
 
-# Load sentence transformer model for semantic fallback
-model = SentenceTransformer("paraphrase-MiniLM-L6-v2")
+
+# ✅ Taxonomy embeddings are computed once (and shared across prefork workers)
+def known_skill_embeddings():
+    return get_embedding_table(MINILM_MODEL, "known_skills", ALL_KNOWN_SKILLS)
 
 
 # ✅ Clean and normalize text
@@ -23,11 +28,18 @@ def preprocess(text):
 
 
 # ✅ Tokenize and remove stop words
-def tokenize(text):
-    doc = nlp(text)
+def _token_set(doc):
     return set(token.text.lower() for token in doc if not token.is_stop and not token.is_punct)
 
 
+def _tokens_batch(texts, n_process, batch_size):
+    # The tokenizer is fast and single-threaded; n_process only matters for model pipelines
+    return [_token_set(doc) for doc in nlp.tokenizer.pipe((preprocess(t) for t in texts), batch_size=batch_size)]
+
+
+register_task("tokens", _tokens_batch)
+
+
 # ✅ Regex-based enrichment for missing HTML/CSS variants
 def extract_html_css_variants(text):
     variants = set()
@@ -41,53 +53,54 @@ def extract_html_css_variants(text):
 # ✅ Semantic fallback matcher using sentence transformers
 def semantic_skill_match(text, known_skills, threshold=0.75):
 
+    # Sentence transformer for the semantic fallback, loaded on first use
+    model = get_sentence_model(MINILM_MODEL)
     sentences = text.split("\n")
-    doc_embeddings = model.encode(sentences, convert_to_tensor=True, device="cpu")
-    skill_embeddings = model.encode(known_skills, convert_to_tensor=True, device="cpu")
-
-    hits = util.cos_sim(doc_embeddings, skill_embeddings)
-    matched = set()
+    known_skills = list(known_skills)
+    doc_embeddings = encode_normalized(model, sentences)
 
-    for i in range(len(sentences)):
-        for j in range(len(known_skills)):
-            if hits[i][j] > threshold:
-                matched.add(known_skills[j].title())
+    rows = known_skill_embeddings().rows(known_skills)
+    missing = [i for i, row in enumerate(rows) if row is None]
+    if missing:
+        for i, emb in zip(missing, encode_normalized(model, [known_skills[i] for i in missing])):
+            rows[i] = emb
+    skill_embeddings = np.stack(rows)
 
-    return list(matched)
+    # Cosine similarity of normalized embeddings; a skill matches if any sentence clears the threshold
+    hits = doc_embeddings @ skill_embeddings.T
+    return list({known_skills[j].title() for j in np.flatnonzero((hits > threshold).any(axis=0))})
 
 
 # ✅ Core matching function: combines exact match, synonym match, and fallback
-def match_skills(text, skill_list=None):
+def match_skills(text, skill_list=None, semantic=True):
     text_clean = preprocess(text)
-    tokens = tokenize(text_clean)
+    tokens = annotation(text, "tokens")
     matched = set()
 
     skills_to_check = skill_list if skill_list else ALL_KNOWN_SKILLS
+    single_index, multi_word = build_skill_index(skill_list) if skill_list else _SKILL_INDEX
 
-    # Step 1: Exact match (single and multi-word)
-    for skill in skills_to_check:
-        norm_skill = normalize_skill(skill)
-        if " " in norm_skill:
-            if norm_skill in text_clean:
-                matched.add(skill)
-        else:
-            if norm_skill in tokens:
-                matched.add(skill)
+    # Step 1: Exact match (single-word via token lookup, multi-word via substring)
+    for token in tokens:
+        matched.update(single_index.get(token, ()))
+    for skill, norm_skill in multi_word:
+        if norm_skill in text_clean:
+            matched.add(skill)
 
     # Step 2: Regex pattern for HTML/CSS variants
     regex_variants = extract_html_css_variants(text)
     matched.update(regex_variants)
 
     # Step 3: Synonym expansion
-    for canonical, variants in SYNONYM_MAP.items():
-        for variant in variants:
-            variant_lower = normalize_skill(variant)
-            if (" " in variant_lower and variant_lower in text_clean) or (variant_lower in tokens):
-                matched.add(canonical.title())
-                break
-
-    # Step 4: Semantic fallback if low match count
-    if len(matched) < 3:
+    synonym_single, synonym_multi = _SYNONYM_INDEX
+    for token in tokens:
+        matched.update(synonym_single.get(token, ()))
+    for canonical_title, variant_lower in synonym_multi:
+        if canonical_title not in matched and variant_lower in text_clean:
+            matched.add(canonical_title)
+
+    # Step 4: Semantic fallback if low match count (skipped under a tight latency budget)
+    if semantic and len(matched) < 3:
         fallback = semantic_skill_match(text, skills_to_check, threshold=0.85)
         matched.update(fallback)
 
@@ -0,0 +1,163 @@
+import numpy as np
+
+from resume_matcher.matcher import tag_resume
+from resume_matcher.records import MatchRecord, BUCKET_LABELS, DEFAULT_SCORING, TIER_FULL
+from resume_matcher.utils import extract_mobile, extract_email
+
+# A scored row is (name, tags, evidence, mobile, email, duplicate_of, tier):
+# the per-resume output of tag_resume plus contact details and the TIER_* it
+# was matched at. Rows are gathered into a BatchScores, where all weighting
+# and ranking happens on arrays.
+
+
+def resume_row(jd_profile, name, resume_text, resume_profile=None, tier=TIER_FULL):
+    if resume_profile is not None:
+        tier = max(tier, resume_profile.tier)
+    tags, evidence = tag_resume(jd_profile, resume_text, resume_profile, tier)
+    return name, tags, evidence, extract_mobile(resume_text), extract_email(resume_text), None, tier
+
+
+def duplicate_row(row, name, mobile, email):
+    """Row for a near-duplicate of an already tagged resume."""
+    return name, row[1], row[2], mobile, email, row[0], row[6]
+
+
+def fanout_row(row):
+    """
+    What duplicate_row needs from a representative, minus the evidence
+    sentences: name, tags and tier. Cheap enough to hold for every
+    representative of a run; BatchScores.share_evidence() restores the
+    evidence of duplicates that make the top-k.
+    """
+    return row[0], row[1], (None,) * len(row[1]), None, None, None, row[6]
+
+
+# ========== Columnar Scores ==========
+class BatchScores:
+    """
+    Scores of N resumes against one JD, one array per column:
+
+        tags      (N, S) uint8    TAG_* code of each of the S JD skills
+        weighted  (N,)   float64  sum of the tag weights
+        percent   (N,)   int64    weighted / S as a rounded percentage
+        bucket    (N,)   int8     BUCKET_* shortlist bucket
+        tier      (N,)   int8     TIER_* matching quality of the row
+
+    Names, evidence and contacts stay as plain lists; MatchRecords are only
+    built for the rows that are actually rendered or exported.
+    """
+    __slots__ = ("skill_ids", "scoring", "names", "tags", "evidence", "mobiles", "emails", "duplicate_of",
+                 "tier", "weighted", "percent", "bucket")
+
+    def __init__(self, skill_ids, names, tags, evidence, mobiles, emails, duplicate_of, tier,
+                 scoring=DEFAULT_SCORING):
+        self.skill_ids = skill_ids
+        self.scoring = scoring
+        self.names = names
+        self.tags = tags
+        self.evidence = evidence
+        self.mobiles = mobiles
+        self.emails = emails
+        self.duplicate_of = duplicate_of
+        self.tier = np.asarray(tier, dtype=np.int8)
+
+        self.weighted = scoring.weight_array[tags].sum(axis=1)
+        self.percent = scoring.percents(self.weighted, max(1, len(skill_ids)))
+        self.bucket = scoring.buckets(self.percent)
+
+    @classmethod
+    def from_rows(cls, skill_ids, rows, scoring=DEFAULT_SCORING):
+        rows = list(rows)
+        width = len(skill_ids)
+        tags = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.uint8).reshape(len(rows), width)
+        columns = [list(column) for column in zip(*rows)] if rows else [[] for _ in range(7)]
+        names, _, evidence, mobiles, emails, duplicate_of, tier = columns
+        return cls(skill_ids, names, tags, evidence, mobiles, emails, duplicate_of, tier, scoring)
+
+    @classmethod
+    def concat(cls, batches):
+        """Stack batches scored against the same JD (row order is kept)."""
+        batches = [b for b in batches if b is not None]
+        first = batches[0]
+        if len(batches) == 1:
+            return first
+        return cls(
+            first.skill_ids,
+            [n for b in batches for n in b.names],
+            np.concatenate([b.tags for b in batches]),
+            [e for b in batches for e in b.evidence],
+            [m for b in batches for m in b.mobiles],
+            [e for b in batches for e in b.emails],
+            [d for b in batches for d in b.duplicate_of],
+            np.concatenate([b.tier for b in batches]),
+            first.scoring,
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def take(self, indices):
+        indices = np.asarray(indices, dtype=np.intp)
+        picked = indices.tolist()
+        return BatchScores(
+            self.skill_ids,
+            [self.names[i] for i in picked],
+            self.tags[indices],
+            [self.evidence[i] for i in picked],
+            [self.mobiles[i] for i in picked],
+            [self.emails[i] for i in picked],
+            [self.duplicate_of[i] for i in picked],
+            self.tier[indices],
+            self.scoring,
+        )
+
+    # ---- ranking ----
+    def top_k(self, k=None):
+        """
+        Indices of the k best rows, best first. Equal percentages keep input
+        order, so the result matches a stable sort by percent.
+        """
+        n = len(self)
+        if k is None or k >= n:
+            k = n
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        # Unique integer key: percent first, earlier row wins a tie
+        key = self.percent * n + (n - 1 - np.arange(n))
+        top = np.argpartition(-key, k - 1)[:k] if k < n else np.arange(n)
+        return top[np.argsort(-key[top])]
+
+    def bucket_counts(self):
+        counts = np.bincount(self.bucket, minlength=len(BUCKET_LABELS)) if len(self) else ()
+        return {BUCKET_LABELS[b]: int(c) for b, c in enumerate(counts) if c}
+
+    def share_evidence(self):
+        """
+        Give duplicates built from fanout_row() the evidence of their
+        representative when it is in this batch too (same name and tags).
+        """
+        originals = {}
+        for i, (name, duplicate_of) in enumerate(zip(self.names, self.duplicate_of)):
+            if duplicate_of is None:
+                originals.setdefault((name, self.tags[i].tobytes()), self.evidence[i])
+        for i, duplicate_of in enumerate(self.duplicate_of):
+            if duplicate_of is not None:
+                evidence = originals.get((duplicate_of, self.tags[i].tobytes()))
+                if evidence is not None:
+                    self.evidence[i] = evidence
+        return self
+
+    def tier_counts(self):
+        """TIER_* code → number of rows matched at that tier."""
+        return {int(t): int(c) for t, c in enumerate(np.bincount(self.tier)) if c} if len(self) else {}
+
+    # ---- rendering ----
+    def record(self, i):
+        return MatchRecord.from_scores(
+            self.names[i], self.skill_ids, self.tags[i].tobytes(), self.evidence[i],
+            self.weighted[i], self.percent[i], self.bucket[i],
+            self.mobiles[i], self.emails[i], self.duplicate_of[i], self.tier[i]
+        )
+
+    def records(self, indices=None):
+        return [self.record(i) for i in (range(len(self)) if indices is None else indices)]
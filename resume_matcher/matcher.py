@@ -1,57 +1,114 @@
-from sentence_transformers import SentenceTransformer, util
-import torch
-import spacy
+import numpy as np
 
 from resume_matcher.utils import extract_mobile, extract_email, clean_skills
 from resume_matcher.skill_helpers import normalize_skill, apply_reverse_synonyms, expand_synonyms
 from jd_parser.skill_matcher import match_skills
 from resume_matcher.skill_depth import evaluate_skill_depth
-from config.skills import ROLE_BASED_SKILLS, SYNONYM_MAP
+from resume_matcher.records import (
+    DocumentProfile, MatchRecord, TAG_CODES, TAG_NONE, DEFAULT_SCORING, TIER_FULL, TIER_REDUCED, TIER_EXACT
+)
+from resume_matcher.vocab import VOCAB, TAXONOMY_SIZE
+from utils.artifact import get_artifact
+from utils.models import get_nlp, get_sentence_model, get_embedding_table, encode_normalized, JOBBERT_MODEL
+from utils.nlp_batch import register_task, annotation
 
 # ========== Model & NLP Init ==========
-nlp = spacy.load("en_core_web_sm")
+nlp = get_nlp(task="noun_chunks")  # tagger + parser only, no NER/lemmatizer
 
-try:
-    model_jobbert = SentenceTransformer("TechWolf/JobBERT-v2", device="cpu")
-    model_jobbert.encode(["test"], convert_to_tensor=True)
-    #print("✅ JobBERT model loaded successfully")
-except Exception as e:
-    print(f"❌ JobBERT loading failed: {e}")
-    model_jobbert = None
+
+# ✅ JobBERT is loaded on first use (or by the startup warm-up thread), not at import
+def jobbert_model():
+    return get_sentence_model(JOBBERT_MODEL, required=False)
+
+
+# ✅ JobBERT embeddings of every taxonomy skill, computed once (shared across prefork workers)
+def taxonomy_embeddings():
+    return get_embedding_table(JOBBERT_MODEL, "taxonomy", VOCAB.decode(range(TAXONOMY_SIZE)))
+
+
+def embed_jd_skills(jd_skills):
+    table = taxonomy_embeddings()
+    rows = table.rows(jd_skills) if table is not None else [None] * len(jd_skills)
+    missing = [i for i, row in enumerate(rows) if row is None]
+    if missing:
+        for i, emb in zip(missing, encode_normalized(jobbert_model(), [jd_skills[i] for i in missing])):
+            rows[i] = emb
+    return np.stack(rows)
 
 # ========== Helpers ==========
-def extract_resume_skills(text, skill_list=None, min_skills=5):
-    skills = clean_skills(match_skills(text, skill_list=skill_list))
-    if len(skills) < min_skills:
-        doc = nlp(text)
-        fallback = [
-            chunk.text.strip()
-            for chunk in doc.noun_chunks
-            if 2 < len(chunk.text.strip()) < 40
-        ]
-        skills += fallback
-    return apply_reverse_synonyms(set(skills))
+def _noun_chunks_batch(texts, n_process, batch_size):
+    return [
+        [chunk.text.strip() for chunk in doc.noun_chunks if 2 < len(chunk.text.strip()) < 40]
+        for doc in nlp.pipe(texts, n_process=n_process, batch_size=batch_size)
+    ]
+
+
+# Only sparse resumes need noun chunks, so this task is not part of the default batch
+register_task("noun_chunks", _noun_chunks_batch, default=False)
+
+
+MIN_RESUME_SKILLS = 5
+MAX_REDUCED_NOUN_CHUNKS = 40   # noun-chunk candidates sent to JobBERT at TIER_REDUCED
+
+
+def extract_resume_skills(text, skill_list=None, min_skills=MIN_RESUME_SKILLS, profile=None, tier=TIER_FULL):
+    if profile is not None and skill_list is None:
+        # Reuse the skills already matched for this document's profile
+        skills = set(profile.skills)
+        skill_count = profile.raw_skill_count
+    else:
+        raw = clean_skills(match_skills(text, skill_list=skill_list, semantic=tier == TIER_FULL))
+        skills = set(apply_reverse_synonyms(raw))
+        skill_count = len(raw)
+
+    if skill_count < min_skills and tier != TIER_EXACT:
+        fallback = annotation(text, "noun_chunks")
+        if tier == TIER_REDUCED:
+            fallback = fallback[:MAX_REDUCED_NOUN_CHUNKS]
+        skills.update(apply_reverse_synonyms(fallback))
+    return list(skills)
 
 def get_threshold(skill):
     return 0.55 if len(skill.split()) <= 2 else 0.65
 
+def exact_skill_match(jd_skills, resume_skills):
+    """TIER_EXACT: a JD skill matches only if a resume skill normalizes to it (synonyms included)."""
+    normalized = {normalize_skill(s): s for s in resume_skills}
+    matched, unmatched, match_sources = set(), set(), {}
+    for skill in jd_skills:
+        trigger = normalized.get(normalize_skill(skill))
+        if trigger is None:
+            unmatched.add(skill)
+        else:
+            matched.add(skill)
+            match_sources[skill] = trigger
+    return matched, unmatched, match_sources
+
 # ========== Skill Matcher ==========
-def fuzzy_skill_match(jd_skills, resume_text):
-    resume_skills = extract_resume_skills(resume_text)
+def fuzzy_skill_match(jd_skills, resume_text, resume_profile=None, tier=TIER_FULL):
+    resume_skills = extract_resume_skills(resume_text, profile=resume_profile, tier=tier)
     resume_skills = expand_synonyms(resume_skills)
-    resume_embeddings = model_jobbert.encode(resume_skills, convert_to_tensor=True)
 
     matched = set()
     unmatched = set()
     match_sources = {}
 
-    for skill in jd_skills:
-        threshold = get_threshold(skill)
-        skill_emb = model_jobbert.encode(skill, convert_to_tensor=True)
-        sims = util.pytorch_cos_sim(skill_emb, resume_embeddings)[0]
+    jd_skills = list(jd_skills)
+    if not jd_skills or not resume_skills:
+        return matched, set(jd_skills), match_sources
+
+    if tier == TIER_EXACT:
+        return exact_skill_match(jd_skills, resume_skills)
 
-        best_idx = torch.argmax(sims).item()
-        best_score = sims[best_idx].item()
+    # Cosine similarity of every JD skill against every resume skill in one product
+    resume_embeddings = encode_normalized(jobbert_model(), resume_skills)
+    sims = embed_jd_skills(jd_skills) @ resume_embeddings.T
+    best_indices = sims.argmax(axis=1)
+
+    for row, skill in enumerate(jd_skills):
+        threshold = get_threshold(skill)
+        best_idx = best_indices[row]
+        best_score = sims[row, best_idx]
         best_match = resume_skills[best_idx]
 
         if best_score >= threshold:
@@ -63,86 +120,65 @@ def fuzzy_skill_match(jd_skills, resume_text):
     return matched, unmatched, match_sources
 
 # ========== Main Function ==========
-def compare_jd_resume(jd_text, resume_text):
+ALL_VALID_SKILLS = get_artifact()["valid_skills"]
+
+
+def build_jd_profile(jd_text):
+    """Extract JD skills once; every resume is then scored against the same profile."""
     jd_skills_raw = match_skills(jd_text)
     jd_skills_raw = clean_skills(jd_skills_raw)
 
-    all_valid_skills = {
-        normalize_skill(skill)
-        for skills in ROLE_BASED_SKILLS.values()
-        for skill in skills
-    } | set(SYNONYM_MAP.keys())
-
-    jd_skills_filtered = [s for s in jd_skills_raw if normalize_skill(s) in all_valid_skills]
+    jd_skills_filtered = [s for s in jd_skills_raw if normalize_skill(s) in ALL_VALID_SKILLS]
     jd_skills = apply_reverse_synonyms(jd_skills_filtered) if len(jd_skills_filtered) >= 3 else apply_reverse_synonyms(jd_skills_raw)
     #print(f"📌 Extracted JD Skills: {jd_skills}")
 
-    matched_skills, missing_skills, match_sources = fuzzy_skill_match(jd_skills, resume_text)
+    return DocumentProfile(jd_text, VOCAB.encode(jd_skills))
+
+
+def build_resume_profile(resume_text, tier=TIER_FULL):
+    raw = clean_skills(match_skills(resume_text, semantic=tier == TIER_FULL))
+    return DocumentProfile(resume_text, VOCAB.encode(apply_reverse_synonyms(raw)), raw_skill_count=len(raw), tier=tier)
+
+
+def tag_resume(jd_profile, resume_text, resume_profile=None, tier=TIER_FULL):
+    """One TAG_* code and one evidence tuple (or None) per JD skill."""
+    jd_skills = jd_profile.skills
+
+    matched_skills, missing_skills, match_sources = fuzzy_skill_match(jd_skills, resume_text, resume_profile, tier)
 
     skill_depth = evaluate_skill_depth(resume_text, jd_skills)
     #print(f"🔍 Skill Justification (raw): {skill_depth}")
 
-    tooltip_justification = {}
+    tags = []
+    evidence = []
     for skill in jd_skills:
-        tag = skill_depth.get(skill, {}).get("tag", "◾️ No Mention")
+        depth = skill_depth.get(skill, {})
+        tag = TAG_CODES.get(depth.get("tag"), TAG_NONE)
         trigger = match_sources.get(skill)
-        if trigger and tag != "◾️ No Mention":
-            tooltip_justification[skill] = {
-                "tag": tag,
-                "source": skill_depth[skill].get("source", ""),
-                "trigger": trigger,
-                "sentence": skill_depth[skill].get("sentence", "")
-            }
+        if trigger and tag != TAG_NONE:
+            evidence.append((depth.get("source", ""), trigger, depth.get("sentence", "")))
         else:
-            tooltip_justification[skill] = {
-                "tag": tag,
-                "source": "",
-                "trigger": "",
-                "sentence": ""
-            }
-
-    # Weighted Scoring
-    weights = {
-        "🛠️ Strong Mention": 1.0,
-        "📌 Weak Mention": 0.5,
-        "◾️ No Mention": 0.0
-    }
-
-    strong_count = 0
-    weak_count = 0
-    weighted_score = 0.0
-
-    for skill in jd_skills:
-        tag = skill_depth.get(skill, {}).get("tag", "◾️ No Mention")
-        if tag == "🛠️ Strong Mention":
-            strong_count += 1
-            weighted_score += 1.0
-        elif tag == "📌 Weak Mention":
-            weak_count += 1
-            weighted_score += 0.5
-
-    total = max(1, len(jd_skills))
-    weighted_percent = round((weighted_score / total) * 100)
-
-    # Match display in format: 75% weighted (🛠️+📌 = 3.0 / 4)
-    match_summary = f"{weighted_percent}% weighted (🛠️+📌 = {weighted_score:.1f} / {total})"
-
-    shortlist = (
-        "✅ Good Match" if weighted_percent >= 60 else
-        ("✳️ Partial Match" if weighted_percent >= 40 else "⚠️ Low match")
+            evidence.append(None)
+        tags.append(tag)
+
+    return bytes(tags), tuple(evidence)
+
+
+def score_resume(jd_profile, resume_text, name="", resume_profile=None, scoring=DEFAULT_SCORING, tier=TIER_FULL):
+    if resume_profile is not None:
+        tier = max(tier, resume_profile.tier)
+    tags, evidence = tag_resume(jd_profile, resume_text, resume_profile, tier)
+    return MatchRecord(
+        name,
+        jd_profile.skill_ids,
+        tags,
+        evidence,
+        mobile=extract_mobile(resume_text),
+        email=extract_email(resume_text),
+        scoring=scoring,
+        tier=tier
     )
 
-    return {
-        "jd_skills": sorted(jd_skills),
-        "strengths": sorted([s for s in jd_skills if skill_depth.get(s, {}).get("tag") in ["🛠️ Strong Mention", "📌 Weak Mention"]]),
-        "gaps": sorted([s for s in jd_skills if skill_depth.get(s, {}).get("tag") == "◾️ No Mention"]),
-        "match_summary": match_summary,
-        "shortlist": shortlist,
-        "mobile": extract_mobile(resume_text),
-        "email": extract_email(resume_text),
-        "skill_justification": tooltip_justification,
-        "weighted_score": weighted_score,
-        "total_skills": total,
-        "strong_count": strong_count,
-        "weak_count": weak_count
-    }
+
+def compare_jd_resume(jd_text, resume_text):
+    return score_resume(build_jd_profile(jd_text), resume_text).to_dict()
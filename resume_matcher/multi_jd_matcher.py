@@ -1,87 +1,97 @@
 import os
 import time
-from io import BytesIO
-from sentence_transformers import util
-
-from jd_parser.extractor import extract_text_from_pdf, extract_text_from_docx, extract_text_from_txt
-from jd_parser.skill_matcher import match_skills
-from resume_matcher.matcher import compare_jd_resume
-from config.skills import ROLE_BASED_SKILLS, SYNONYM_MAP
-
-# ========= Normalize Skill =========
-def normalize(skill):
-    for canonical, variants in SYNONYM_MAP.items():
-        if skill.lower().strip() in [v.lower().strip() for v in variants]:
-            return canonical.lower().strip()
-    return skill.lower().strip()
-
-# ========= Get Role Score Mapping =========
-def get_role_scores(text):
-    raw_skills = match_skills(text)
-    flattened = [item for sublist in raw_skills for item in (sublist if isinstance(sublist, list) else [sublist])]
-    normalized = set([normalize(skill) for skill in flattened])
-    role_scores = {}
-
-    for role, keywords in ROLE_BASED_SKILLS.items():
-        normalized_keywords = set([normalize(k) for k in keywords])
-        matched = normalized & normalized_keywords
-        score = len(matched) / len(normalized_keywords) if normalized_keywords else 0
-        role_scores[role] = score
-
-    return role_scores
-
-# ========= Infer Top Role =========
-def infer_resume_role(text):
-    role_scores = get_role_scores(text)
-    sorted_roles = sorted(role_scores.items(), key=lambda x: x[1], reverse=True)
-    return sorted_roles[0][0] if sorted_roles and sorted_roles[0][1] >= 0.15 else "unknown"
-
-# ========= File Reader =========
-def extract_text(file):
-    ext = os.path.splitext(file.name)[-1].lower()
-    try:
-        if hasattr(file, "read"):
-            content = file.read()
-        elif hasattr(file, "name") and os.path.isfile(file.name):
-            with open(file.name, "rb") as f:
-                content = f.read()
-        else:
-            return None, "❌ Could not read file content."
-
-        if not content:
-            return None, "❌ File is empty."
-
-        if ext == ".pdf":
-            return extract_text_from_pdf(BytesIO(content)), None
-        elif ext == ".docx":
-            return extract_text_from_docx(BytesIO(content)), None
-        elif ext == ".txt":
-            return extract_text_from_txt(BytesIO(content)), None
-        else:
-            return None, "❌ Unsupported file format."
-    except Exception as e:
-        return None, f"❌ Extraction failed: {str(e)}"
+from collections import Counter
+
+from resume_matcher.matcher import build_jd_profile, build_resume_profile, MIN_RESUME_SKILLS
+from resume_matcher.batch_scoring import BatchScores, resume_row, duplicate_row
+from resume_matcher.role_classifier import ROLE_CLASSIFIER, UNKNOWN_ROLE
+from resume_matcher.records import TIER_EXACT
+from resume_matcher.utils import extract_mobile, extract_email
+from utils.dedup import DuplicateIndex, DEDUP_ENABLED
+from utils.budget import LatencyBudget
+from utils.profiling import profiled, profile_note
+from utils.exporter import StreamingExporter
+from utils.ingest import iter_documents, extract_text
+from utils.nlp_batch import annotate_batch, pinned_annotations
+
+ROLE_PREFILTER_K = 3
+
+# ========= Role Prefilter =========
+def matches_jd_role(jd_role, resume_profile, k=ROLE_PREFILTER_K):
+    if jd_role == UNKNOWN_ROLE:
+        return True
+    if any(role == jd_role for role, _ in ROLE_CLASSIFIER.top_k(resume_profile, k)):
+        return True
+    return jd_role.lower() in resume_profile.text.lower()
 
 # ========= Main Comparison =========
-def compare_multiple_jds_resumes(jd_files, resume_files):
+@profiled("multi-jd")
+def compare_multiple_jds_resumes(jd_files, resume_files, export_format="xlsx", time_budget=None, profile=False):
     print('inside compare_multiple_jds_resumes')
     if not jd_files or not resume_files:
-        return "<b>❌ Please upload both JD and Resume files.</b>", ""
+        return "<b>❌ Please upload both JD and Resume files.</b>", "", None
 
     start = time.time()
+    latency = LatencyBudget(time_budget)
+    tiers = Counter()
     html_blocks = []
+    # ✅ One sheet per JD, rows streamed as each resume is scored
+    exporter = StreamingExporter(fmt=export_format)
+
+    # ✅ Profile every resume once (skills + role scores), not once per JD
+    extracted = [(doc.name,) + extract_text(doc) for doc in iter_documents(resume_files)]
+
+    # ✅ Near-duplicates (re-exports, vendor copies) are profiled and scored once;
+    # duplicates[i] = (index of the first copy, mobile, email)
+    duplicates = {}
+    if DEDUP_ENABLED:
+        index = DuplicateIndex()
+        for i, (_, text, error) in enumerate(extracted):
+            if not error:
+                representative = index.find_or_add(i, text)
+                if representative is not None:
+                    duplicates[i] = (representative, extract_mobile(text), extract_email(text))
+
+    # ✅ One nlp.pipe pass over all resumes. Every JD re-reads the cached
+    # annotations, so they stay pinned (never evicted) until the last JD is done
+    # and are freed right after instead of lingering in the worker.
+    texts = [text for i, (_, text, error) in enumerate(extracted) if not error and i not in duplicates]
+    with pinned_annotations(texts):
+        annotate_batch(texts)
+
+        def build_profile(text):
+            resume_profile = build_resume_profile(text, latency.tier())
+            latency.finished()
+            return resume_profile
+
+        latency.expect(sum(1 for i, (_, _, error) in enumerate(extracted) if not error and i not in duplicates))
+        resume_profiles = [
+            (name, None if error or i in duplicates else build_profile(text), error)
+            for i, (name, text, error) in enumerate(extracted)
+        ]
+        if latency.tier() != TIER_EXACT:
+            annotate_batch(
+                [p.text for _, p, _ in resume_profiles if p is not None and p.raw_skill_count < MIN_RESUME_SKILLS],
+                tasks=["noun_chunks"]
+            )
+        ROLE_CLASSIFIER.score_batch([profile for _, profile, _ in resume_profiles if profile is not None])
+
+        for position, jd_doc in enumerate(iter_documents(jd_files)):
+            jd_text, error = extract_text(jd_doc)
+            jd_name = jd_doc.name
+            # Keyed by position: two JDs with the same file name get separate sheets
+            jd_sheet = (position, jd_name)
 
-    for jd_file in jd_files:
-        jd_text, error = extract_text(jd_file)
-        jd_name = os.path.basename(jd_file.name)
+            if error:
+                html_blocks.append(f"<h3>{jd_name}</h3><p>{error}</p>")
+                continue
 
-        if error:
-            html_blocks.append(f"<h3>{jd_name}</h3><p>{error}</p>")
-            continue
+            exporter.add_sheet(jd_sheet, jd_name)
+            jd_profile = build_jd_profile(jd_text)
 
-        jd_role = infer_resume_role(jd_text)
+            jd_role = ROLE_CLASSIFIER.infer(jd_profile)
 
-        jd_block = f"""
+            jd_block = f"""
 <details style='margin-bottom:15px; border:1px solid #444; border-radius:8px; background-color:white; color:white; padding:10px;'>
   <summary style='font-weight:bold; font-size:18px; color:#FF6600;'>{jd_name} <span style='color:gray;'>({jd_role})</span></summary>
   <div style='padding:10px;'>
@@ -99,70 +109,81 @@ def compare_multiple_jds_resumes(jd_files, resume_files):
       <tbody>
 """
 
-        resume_rows = []
-
-        for resume_file in resume_files:
-            resume_text, error = extract_text(resume_file)
-            resume_name = os.path.basename(resume_file.name)
-
-            if error:
-                resume_rows.append((
-                    0,
-                    f"""
+            rows = []
+            error_html = ""
+            jd_rows = {}
+            latency.expect(sum(1 for _, p, _ in resume_profiles if p is not None))
+
+            for i, (resume_name, resume_profile, error) in enumerate(resume_profiles):
+                if i in duplicates:
+                    representative, mobile, email = duplicates[i]
+                    if representative in jd_rows:  # else the first copy failed the role prefilter
+                        rows.append(duplicate_row(jd_rows[representative], resume_name, mobile, email))
+                elif error:
+                    exporter.write_error(jd_sheet, resume_name, error)
+                    error_html += f"""
         <tr>
           <td style='padding:10px; border:1px solid #333;'>{resume_name}</td>
           <td colspan='5' style='padding:10px; border:1px solid #333;'>{error}</td>
         </tr>
 """
-                ))
-                continue
-
-            resume_role = infer_resume_role(resume_text)
-            if jd_role.lower() not in resume_text.lower():
-                continue
-
-            result = compare_jd_resume(jd_text, resume_text)
-
-            skill_html = ""
-            for skill in result["jd_skills"]:
-                tag = result["skill_justification"].get(skill, {}).get("tag", "")
-                trigger = result["skill_justification"].get(skill, {}).get("trigger", "")
-                if tag == "🛠️ Strong Mention":
-                    skill_html += f"<span title='Matched via: {trigger}' style='margin-right:6px;'>🛠️ {skill}</span>"
-                elif tag == "📌 Weak Mention":
-                    skill_html += f"<span title='Matched via: {trigger}' style='margin-right:6px;'>📌 {skill}</span>"
-
-            gap_html = ", ".join(result["gaps"])
-
-            resume_rows.append((
-                result.get("score", 0),
-                f"""
+                elif resume_profile is not None:
+                    if matches_jd_role(jd_role, resume_profile):
+                        jd_rows[i] = resume_row(jd_profile, resume_name, resume_profile.text, resume_profile, latency.tier())
+                        rows.append(jd_rows[i])
+                    latency.finished()
+
+            # ✅ Weighted scores, percentages and ranking for every resume of this JD in one pass
+            batch = BatchScores.from_rows(jd_profile.skill_ids, rows)
+            tiers.update(batch.tier_counts())
+            for record in batch.records(batch.top_k()):
+                exporter.write_record(jd_sheet, record)
+
+                skill_html = ""
+                for skill, info in record.justification().items():
+                    tag = info["tag"]
+                    trigger = info["trigger"]
+                    if tag == "🛠️ Strong Mention":
+                        skill_html += f"<span title='Matched via: {trigger}' style='margin-right:6px;'>🛠️ {skill}</span>"
+                    elif tag == "📌 Weak Mention":
+                        skill_html += f"<span title='Matched via: {trigger}' style='margin-right:6px;'>📌 {skill}</span>"
+
+                gap_html = ", ".join(record.gaps)
+
+                jd_block += f"""
         <tr>
-          <td style='padding:10px; border:1px solid #333; color:black;'>{resume_name}</td>
-          <td style='padding:10px; border:1px solid #333; color:black;'>{result["mobile"] or "Not found"}</td>
-          <td style='padding:10px; border:1px solid #333; color:black;'>{result["match_summary"]}</td>
-          <td style='padding:10px; border:1px solid #333; color:black;'>{result["shortlist"]}</td>
+          <td style='padding:10px; border:1px solid #333; color:black;'>{record.name}</td>
+          <td style='padding:10px; border:1px solid #333; color:black;'>{record.mobile or "Not found"}</td>
+          <td style='padding:10px; border:1px solid #333; color:black;'>{record.match_summary}<br><small>{record.tier_note}</small></td>
+          <td style='padding:10px; border:1px solid #333; color:black;'>{record.shortlist}<br><small>{record.duplicate_note}</small></td>
           <td style='padding:10px; border:1px solid #333; color:black;'>{skill_html}</td>
           <td style='padding:10px; border:1px solid #333; color:black;'>{gap_html}</td>
         </tr>
 """
-            ))
 
-        resume_rows.sort(key=lambda x: x[0], reverse=True)
-
-        for _, row_html in resume_rows:
-            jd_block += row_html
-
-        jd_block += """
+            jd_block += error_html
+            jd_block += """
       </tbody>
     </table>
   </div>
 </details>
 """
-        html_blocks.append(jd_block)
+            html_blocks.append(jd_block)
+
+    export_path = exporter.close()
+    if not exporter.rows_written:
+        os.remove(export_path)
+        export_path = None
 
     full_html = "<div style='padding: 10px;'>" + "".join(html_blocks) + "</div>"
     elapsed = time.time() - start
-    status_msg = f"✅ Ranked {len(resume_files)} resumes in {elapsed:.2f} seconds"
-
-    return full_html, status_msg
\ No newline at end of file
+    status_msg = f"✅ Ranked {len(resume_profiles)} resumes in {elapsed:.2f} seconds"
+    if duplicates:
+        status_msg += f" · 🔁 {len(duplicates)} near-duplicates reused an earlier score"
+    quality_note = latency.describe(tiers)
+    if quality_note:
+        status_msg += f" · {quality_note}"
+    if profile_note():
+        status_msg += f" · {profile_note()}"
+
+    return full_html, status_msg, export_path
@@ -0,0 +1,236 @@
+import os
+
+import numpy as np
+
+from resume_matcher.vocab import VOCAB
+
+# ========== Tag Codes ==========
+TAG_NONE, TAG_WEAK, TAG_STRONG = 0, 1, 2
+TAG_LABELS = ("◾️ No Mention", "📌 Weak Mention", "🛠️ Strong Mention")
+TAG_ICONS = ("", "📌", "🛠️")
+TAG_CODES = {label: code for code, label in enumerate(TAG_LABELS)}
+TAG_WEIGHTS = (0.0, 0.5, 1.0)
+
+GOOD_MATCH_PERCENT = 60
+PARTIAL_MATCH_PERCENT = 40
+
+# ========== Matching Tiers ==========
+# Quality a row was matched at; lower tiers are used to stay inside a latency budget
+TIER_FULL, TIER_REDUCED, TIER_EXACT = 0, 1, 2
+TIER_LABELS = ("Full", "Reduced", "Exact only")
+TIER_NOTES = (
+    "",
+    "⚡ Reduced matching (no semantic fallback, capped noun chunks)",
+    "⚡ Exact/synonym matching only",
+)
+
+# ========== Shortlist Buckets ==========
+BUCKET_LOW, BUCKET_PARTIAL, BUCKET_GOOD = 0, 1, 2
+BUCKET_LABELS = ("⚠️ Low match", "✳️ Partial Match", "✅ Good Match")
+
+
+class ScoringConfig:
+    """Tag weights (indexed by TAG_* code) and the shortlist thresholds, in percent."""
+    __slots__ = ("weights", "weight_array", "good_percent", "partial_percent")
+
+    def __init__(self, weights=TAG_WEIGHTS, good_percent=GOOD_MATCH_PERCENT, partial_percent=PARTIAL_MATCH_PERCENT):
+        if len(weights) != len(TAG_LABELS):
+            raise ValueError(f"Expected {len(TAG_LABELS)} tag weights, got {len(weights)}")
+        if partial_percent > good_percent:
+            raise ValueError("partial_percent must not exceed good_percent")
+        self.weights = tuple(float(w) for w in weights)
+        self.weight_array = np.asarray(self.weights, dtype=np.float64)
+        self.weight_array.flags.writeable = False
+        self.good_percent = good_percent
+        self.partial_percent = partial_percent
+
+    def bucket_of(self, percent):
+        if percent >= self.good_percent:
+            return BUCKET_GOOD
+        if percent >= self.partial_percent:
+            return BUCKET_PARTIAL
+        return BUCKET_LOW
+
+    # ---- vectorized ----
+    def percents(self, weighted, total):
+        # np.rint rounds half to even, exactly like round() in MatchRecord
+        return np.rint((weighted / total) * 100).astype(np.int64)
+
+    def buckets(self, percents):
+        return (percents >= self.partial_percent).astype(np.int8) + (percents >= self.good_percent)
+
+
+def _env_weights():
+    raw = os.getenv("SMARTSCREEN_TAG_WEIGHTS")  # e.g. "0,0.5,1" for none,weak,strong
+    return tuple(float(w) for w in raw.split(",")) if raw else TAG_WEIGHTS
+
+
+DEFAULT_SCORING = ScoringConfig(
+    _env_weights(),
+    good_percent=int(os.getenv("SMARTSCREEN_GOOD_MATCH", GOOD_MATCH_PERCENT)),
+    partial_percent=int(os.getenv("SMARTSCREEN_PARTIAL_MATCH", PARTIAL_MATCH_PERCENT)),
+)
+
+
+def shortlist_label(percent, scoring=DEFAULT_SCORING):
+    return BUCKET_LABELS[scoring.bucket_of(percent)]
+
+
+# ========== Document Profile ==========
+class DocumentProfile:
+    """
+    Extracted text plus its skills as a sorted array of vocabulary IDs.
+    raw_skill_count is the number of distinct skills match_skills found before
+    normalization; role_scores is filled lazily by the role classifier.
+    tier is the TIER_* the skills were matched at.
+    """
+    __slots__ = ("text", "skill_ids", "raw_skill_count", "role_scores", "tier")
+
+    def __init__(self, text, skill_ids, raw_skill_count=None, tier=TIER_FULL):
+        self.text = text
+        self.skill_ids = skill_ids
+        self.raw_skill_count = len(skill_ids) if raw_skill_count is None else raw_skill_count
+        self.role_scores = None
+        self.tier = tier
+
+    @property
+    def skills(self):
+        return VOCAB.decode(self.skill_ids)
+
+
+# ========== Match Record ==========
+class MatchRecord:
+    """
+    Compact result of scoring one resume against one JD.
+
+    skill_ids, tags and evidence are parallel: tags holds one TAG_* code per
+    JD skill and evidence holds (source, trigger, sentence) or None. Display
+    strings are produced on demand by the properties below. duplicate_of
+    names the resume whose score this record reuses (near-duplicate text).
+    weighted_score, percent and bucket are fixed at construction, either
+    from a ScoringConfig or from the columns of a BatchScores. tier is the
+    TIER_* matching quality the tags were produced at.
+    """
+    __slots__ = (
+        "name", "skill_ids", "tags", "evidence", "weighted_score", "percent", "bucket",
+        "mobile", "email", "duplicate_of", "tier"
+    )
+
+    def __init__(self, name, skill_ids, tags, evidence, mobile="Not found", email="Not found",
+                 scoring=DEFAULT_SCORING, tier=TIER_FULL):
+        tags = bytes(tags)
+        weighted_score = sum(scoring.weights[t] for t in tags)
+        percent = round((weighted_score / max(1, len(skill_ids))) * 100)
+        self._assign(name, skill_ids, tags, tuple(evidence), weighted_score, percent, scoring.bucket_of(percent),
+                     mobile, email, None, tier)
+
+    def _assign(self, name, skill_ids, tags, evidence, weighted_score, percent, bucket, mobile, email, duplicate_of,
+                tier):
+        self.name = name
+        self.skill_ids = skill_ids
+        self.tags = tags
+        self.evidence = evidence
+        self.weighted_score = weighted_score
+        self.percent = percent
+        self.bucket = bucket
+        self.mobile = mobile
+        self.email = email
+        self.duplicate_of = duplicate_of
+        self.tier = tier
+
+    @classmethod
+    def from_scores(cls, name, skill_ids, tags, evidence, weighted_score, percent, bucket,
+                    mobile="Not found", email="Not found", duplicate_of=None, tier=TIER_FULL):
+        """Record whose scores were already computed (e.g. one row of a BatchScores)."""
+        record = cls.__new__(cls)
+        record._assign(name, skill_ids, bytes(tags), tuple(evidence), float(weighted_score), int(percent),
+                       int(bucket), mobile, email, duplicate_of, int(tier))
+        return record
+
+    def duplicate(self, name, mobile, email):
+        """Record for a near-duplicate resume: same score, its own name and contact details."""
+        return MatchRecord.from_scores(
+            name, self.skill_ids, self.tags, self.evidence, self.weighted_score, self.percent, self.bucket,
+            mobile, email, duplicate_of=self.name, tier=self.tier
+        )
+
+    # ---- scores ----
+    @property
+    def total(self):
+        return max(1, len(self.skill_ids))
+
+    @property
+    def strong_count(self):
+        return self.tags.count(TAG_STRONG)
+
+    @property
+    def weak_count(self):
+        return self.tags.count(TAG_WEAK)
+
+    @property
+    def shortlist(self):
+        return BUCKET_LABELS[self.bucket]
+
+    @property
+    def tier_label(self):
+        return TIER_LABELS[self.tier]
+
+    @property
+    def tier_note(self):
+        return TIER_NOTES[self.tier]
+
+    @property
+    def duplicate_note(self):
+        return f"🔁 Duplicate of {self.duplicate_of}" if self.duplicate_of else ""
+
+    # ---- render-time strings ----
+    def _named(self):
+        return sorted(zip(VOCAB.decode(self.skill_ids), self.tags, self.evidence))
+
+    @property
+    def jd_skills(self):
+        return sorted(VOCAB.decode(self.skill_ids))
+
+    @property
+    def strengths(self):
+        return [skill for skill, tag, _ in self._named() if tag != TAG_NONE]
+
+    @property
+    def gaps(self):
+        return [skill for skill, tag, _ in self._named() if tag == TAG_NONE]
+
+    @property
+    def match_summary(self):
+        # Match display in format: 75% weighted (🛠️+📌 = 3.0 / 4)
+        return f"{self.percent}% weighted (🛠️+📌 = {self.weighted_score:.1f} / {self.total})"
+
+    def matched_display(self):
+        return ", ".join(f"{TAG_ICONS[tag]} {skill}" for skill, tag, _ in self._named() if tag != TAG_NONE)
+
+    def justification(self):
+        return {
+            skill: {
+                "tag": TAG_LABELS[tag],
+                "source": ev[0] if ev else "",
+                "trigger": ev[1] if ev else "",
+                "sentence": ev[2] if ev else "",
+            }
+            for skill, tag, ev in self._named()
+        }
+
+    def to_dict(self):
+        """Same shape compare_jd_resume has always returned."""
+        return {
+            "jd_skills": self.jd_skills,
+            "strengths": self.strengths,
+            "gaps": self.gaps,
+            "match_summary": self.match_summary,
+            "shortlist": self.shortlist,
+            "mobile": self.mobile,
+            "email": self.email,
+            "skill_justification": self.justification(),
+            "weighted_score": self.weighted_score,
+            "total_skills": self.total,
+            "strong_count": self.strong_count,
+            "weak_count": self.weak_count
+        }
@@ -0,0 +1,57 @@
+import numpy as np
+
+from utils.artifact import get_artifact
+
+UNKNOWN_ROLE = "unknown"
+ROLE_THRESHOLD = 0.15
+
+
+# ========== Role Classifier ==========
+class RoleClassifier:
+    """
+    Role × skill matrix from the startup artifact (see build_role_matrix).
+    Row r holds 1/|skills(r)| in each of the role's skill columns, so
+    multiplying by a document's 0/1 skill vector gives the fraction of each
+    role's skills the document covers — for every role in a single product.
+    """
+
+    def __init__(self, roles, matrix):
+        self.roles = list(roles)
+        self.matrix = matrix
+        self.width = matrix.shape[1]
+
+    def vector(self, skill_ids):
+        x = np.zeros(self.width, dtype=np.float32)
+        ids = np.frombuffer(skill_ids, dtype=np.uint32) if len(skill_ids) else np.empty(0, dtype=np.uint32)
+        x[ids[ids < self.width]] = 1.0
+        return x
+
+    def scores(self, profile):
+        """Score vector over self.roles, cached on the profile."""
+        if profile.role_scores is None:
+            profile.role_scores = self.matrix @ self.vector(profile.skill_ids)
+        return profile.role_scores
+
+    def score_batch(self, profiles):
+        """Fill role scores for many profiles with one matrix-matrix product."""
+        pending = [p for p in profiles if p.role_scores is None]
+        if pending:
+            X = np.stack([self.vector(p.skill_ids) for p in pending])
+            for profile, row in zip(pending, X @ self.matrix.T):
+                profile.role_scores = row
+        return [p.role_scores for p in profiles]
+
+    def top_k(self, profile, k=3, min_score=0.0):
+        """Best k (role, score) pairs, highest first."""
+        scores = self.scores(profile)
+        # Stable sort keeps ROLE_BASED_SKILLS order on ties, like the old sorted() did
+        top = np.argsort(-scores, kind="stable")[:max(0, k)]
+        return [(self.roles[i], float(scores[i])) for i in top if scores[i] > min_score]
+
+    def infer(self, profile, threshold=ROLE_THRESHOLD):
+        best = self.top_k(profile, k=1)
+        return best[0][0] if best and best[0][1] >= threshold else UNKNOWN_ROLE
+
+
+_artifact = get_artifact()
+ROLE_CLASSIFIER = RoleClassifier(_artifact["roles"], _artifact.role_matrix)
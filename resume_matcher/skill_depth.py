@@ -1,9 +1,10 @@
 import re
-import spacy
 from config.skills import SYNONYM_MAP, ACTION_VERBS, EXPERIENCE_HEADERS
+from utils.models import get_nlp
+from utils.nlp_batch import register_task, annotation
 
-# Load spaCy NLP pipeline
-nlp = spacy.load("en_core_web_sm")
+# Sentence splitting only: senter instead of the full parser
+nlp = get_nlp(task="sentences")
 
 # Ensure ACTION_VERBS is a set
 ACTION_VERBS = set(ACTION_VERBS)
@@ -43,6 +44,19 @@ def extract_experience_sections(text):
     return sections if sections else [text]  # fallback to full resume
 
 
+def _experience_sentences_batch(texts, n_process, batch_size):
+    """Per text: list of experience sections, each a list of (sentence, sentence_lower)."""
+    sections = [(section, i) for i, text in enumerate(texts) for section in extract_experience_sections(text)]
+    results = [[] for _ in texts]
+    for doc, i in nlp.pipe(sections, as_tuples=True, n_process=n_process, batch_size=batch_size):
+        sentences = [sent.text.strip() for sent in doc.sents]
+        results[i].append([(s, s.lower()) for s in sentences])
+    return results
+
+
+register_task("experience_sentences", _experience_sentences_batch)
+
+
 def evaluate_skill_depth(resume_text, matched_skills):
     """
     Categorizes each skill into:
@@ -61,7 +75,8 @@ def evaluate_skill_depth(resume_text, matched_skills):
     }
     """
     skill_scores = {}
-    sections = extract_experience_sections(resume_text)
+    # Sections are split and sentence-segmented once per resume, not once per skill
+    sections = annotation(resume_text, "experience_sentences")
     resume_lower = resume_text.lower()
 
     for skill in matched_skills:
@@ -76,10 +91,7 @@ def evaluate_skill_depth(resume_text, matched_skills):
 
         # 1. Inside Experience Section
         for section in sections:
-            doc = nlp(section)
-            for sent in doc.sents:
-                sent_text = sent.text.strip()
-                sent_lower = sent_text.lower()
+            for sent_text, sent_lower in section:
                 for syn in synonyms:
                     if syn in sent_lower:
                         if any(verb in sent_lower for verb in ACTION_VERBS):
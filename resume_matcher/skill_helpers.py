@@ -1,25 +1,42 @@
 import re
-# resume_matcher/skill_helpers.pyimport re
+# resume_matcher/skill_helpers.py
+from functools import lru_cache
 from config.skills import SYNONYM_MAP, SPECIAL_CHARACTER_SKILLS
 
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_SPECIAL_CHARACTER_SKILLS = frozenset(SPECIAL_CHARACTER_SKILLS)
+
+
+def _strip(text):
+    return _NON_ALNUM.sub('', text.lower())
+
+
+# ✅ Built once: stripped variant/canonical → canonical (first canonical in SYNONYM_MAP wins)
+_CANONICAL_LOOKUP = {}
+for _canonical, _variants in SYNONYM_MAP.items():
+    for _key in [_strip(_canonical)] + [_strip(v) for v in _variants]:
+        _CANONICAL_LOOKUP.setdefault(_key, _canonical)
+
+
+@lru_cache(maxsize=65536)
 def normalize_skill(text):
     raw_text = text.lower().strip()
     
     # Handle special character skills directly (e.g., c#, c++, f#)
-    if raw_text in SPECIAL_CHARACTER_SKILLS:
+    if raw_text in _SPECIAL_CHARACTER_SKILLS:
         return raw_text
 
     # Strip everything except alphanumerics (so css 3 → css3, javascript 4+ → javascript4)
-    clean_text = re.sub(r'[^a-z0-9]+', '', raw_text)
+    clean_text = _NON_ALNUM.sub('', raw_text)
 
     # Compare against synonym variants
-    for canonical, variants in SYNONYM_MAP.items():
-        norm_canonical = re.sub(r'[^a-z0-9]+', '', canonical.lower())
-        norm_variants = [re.sub(r'[^a-z0-9]+', '', v.lower()) for v in variants]
-        if clean_text == norm_canonical or clean_text in norm_variants:
-            return canonical
+    return _CANONICAL_LOOKUP.get(clean_text, clean_text)
+
 
-    return clean_text
+# ✅ Built once: normalized canonical → all variants that expand from it
+_EXPANSIONS = {}
+for _canonical, _variants in SYNONYM_MAP.items():
+    _EXPANSIONS.setdefault(normalize_skill(_canonical), []).extend(_variants)
 
 
 def apply_reverse_synonyms(skills):
@@ -28,8 +45,5 @@ def apply_reverse_synonyms(skills):
 def expand_synonyms(skills):
     expanded = set(skills)
     for skill in skills:
-        norm = normalize_skill(skill)
-        for key, variants in SYNONYM_MAP.items():
-            if norm == normalize_skill(key):
-                expanded.update(variants)
-    return list(expanded)
\ No newline at end of file
+        expanded.update(_EXPANSIONS.get(normalize_skill(skill), ()))
+    return list(expanded)
@@ -0,0 +1,55 @@
+import threading
+from array import array
+
+from config.skills import ROLE_BASED_SKILLS, SYNONYM_MAP
+from resume_matcher.skill_helpers import normalize_skill
+
+
+# ========== Skill Vocabulary ==========
+class SkillVocabulary:
+    """
+    Interns canonical skill names to dense integer IDs. Names are taken as
+    given, so callers pass normalize_skill() output (normalize_skill is not
+    idempotent: "unit testing" itself normalizes to "xunit"). Documents carry
+    sorted ID arrays; strings are only looked up again when a row is rendered.
+    """
+    __slots__ = ("_ids", "_names", "_lock")
+
+    def __init__(self, names=()):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def intern(self, name):
+        skill_id = self._ids.get(name)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(name)
+                if skill_id is None:
+                    skill_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = skill_id
+        return skill_id
+
+    def encode(self, names):
+        """Sorted, de-duplicated uint32 array of skill IDs."""
+        return array("I", sorted({self.intern(name) for name in names}))
+
+    def decode(self, skill_ids):
+        return [self._names[i] for i in skill_ids]
+
+
+# ✅ Taxonomy skills get stable low IDs; anything else is interned on first sight
+VOCAB = SkillVocabulary(
+    normalize_skill(skill)
+    for skill in [s for skills in ROLE_BASED_SKILLS.values() for s in skills] + list(SYNONYM_MAP.keys())
+)
+TAXONOMY_SIZE = len(VOCAB)
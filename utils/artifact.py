@@ -0,0 +1,288 @@
+"""
+Startup artifact: everything derived from config/*.json, compiled once.
+
+    python -m utils.artifact build [--embeddings]
+
+The artifact lives in ARTIFACT_DIR/<config hash>/ and holds the normalized
+taxonomy maps, the skill lookup index, compiled field/role regexes, the
+role × skill matrix and (optionally) taxonomy embeddings per model. Arrays
+are .npy files loaded with mmap_mode="r", so startup maps pages instead of
+computing or copying them, and every process on the host shares them.
+A changed config hash (config files plus the source that compiles them, or
+ARTIFACT_VERSION) triggers a rebuild.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from config.skills import ROLE_BASED_SKILLS, SYNONYM_MAP, ROLE_SYNONYMS
+from resume_matcher.skill_helpers import normalize_skill
+from resume_matcher.vocab import VOCAB, TAXONOMY_SIZE
+
+ARTIFACT_VERSION = 1
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_DIR = os.path.join(REPO_ROOT, "config")
+CONFIG_FILES = ("skills.json", "field_config.json")
+# Code whose output is baked into the artifact (normalization, skill IDs, compilers)
+SOURCE_FILES = ("resume_matcher/skill_helpers.py", "resume_matcher/vocab.py", "utils/artifact.py")
+ARTIFACT_DIR = os.getenv("SMARTSCREEN_ARTIFACT_DIR", os.path.join(REPO_ROOT, ".artifacts"))
+
+_lock = threading.Lock()
+_artifact = None
+
+
+def config_path(name):
+    return os.path.join(CONFIG_DIR, name)
+
+
+def config_hash():
+    digest = hashlib.sha256(f"v{ARTIFACT_VERSION}".encode())
+    paths = [config_path(name) for name in CONFIG_FILES]
+    paths += [os.path.join(REPO_ROOT, name) for name in SOURCE_FILES]
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(os.path.relpath(path, REPO_ROOT).encode())
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+# ========== Compilers ==========
+def build_skill_index(skills):
+    """
+    Exact-match index for match_skills: single-token skills are looked up
+    from the token set, multi-word skills are substring-checked.
+    """
+    single, multi = {}, []
+    for skill in skills:
+        norm = normalize_skill(skill)
+        if " " in norm:
+            multi.append((skill, norm))
+        else:
+            single.setdefault(norm, []).append(skill)
+    return single, multi
+
+
+def build_synonym_index(synonym_map):
+    single, multi = {}, []
+    for canonical, variants in synonym_map.items():
+        title = canonical.title()
+        for variant in variants:
+            norm = normalize_skill(variant)
+            if " " in norm:
+                multi.append((title, norm))
+            else:
+                single.setdefault(norm, set()).add(title)
+    return single, multi
+
+
+def build_field_config(field_config):
+    return {
+        field: {
+            "labels": [label.lower() for label in spec["labels"]],
+            "patterns": [re.compile(p, re.IGNORECASE) for p in spec["patterns"]],
+        }
+        for field, spec in field_config.items()
+    }
+
+
+def build_role_keywords(role_synonyms):
+    """Keyword → first role, the single alternation and keyword containment map."""
+    keyword_role = {}
+    for role, keywords in role_synonyms.items():
+        for keyword in keywords:
+            keyword_role.setdefault(keyword.lower(), role)
+
+    # Longest keywords first; the lookahead makes every start position a candidate
+    pattern = re.compile(
+        r"(?=(\b(?:" + "|".join(re.escape(k) for k in sorted(keyword_role, key=len, reverse=True)) + r")\b))"
+    )
+    # Shorter keywords found inside a longer one (e.g. "c#" inside "c# developer")
+    contained = {
+        keyword: [other for other in keyword_role if re.search(r"\b" + re.escape(other) + r"\b", keyword)]
+        for keyword in keyword_role
+    }
+    return keyword_role, pattern, contained
+
+
+def build_role_matrix(role_skills, vocab=VOCAB):
+    """Row r holds 1/|skills(r)| in each of role r's vocabulary columns."""
+    role_ids = [vocab.encode(normalize_skill(s) for s in skills) for skills in role_skills.values()]
+    width = max((ids[-1] + 1 for ids in role_ids if ids), default=0)
+
+    matrix = np.zeros((len(role_ids), width), dtype=np.float32)
+    for row, ids in enumerate(role_ids):
+        if len(ids):
+            matrix[row, ids] = 1.0 / len(ids)
+    return matrix
+
+
+def _compile_taxonomy():
+    with open(config_path("field_config.json"), "r", encoding="utf-8") as f:
+        field_config = json.load(f)
+
+    known_skills = sorted({skill for skills in ROLE_BASED_SKILLS.values() for skill in skills})
+    return {
+        "vocab": VOCAB.decode(range(TAXONOMY_SIZE)),
+        "known_skills": known_skills,
+        "skill_index": build_skill_index(known_skills),
+        "synonym_index": build_synonym_index(SYNONYM_MAP),
+        "valid_skills": {normalize_skill(s) for s in known_skills} | set(SYNONYM_MAP.keys()),
+        "roles": list(ROLE_BASED_SKILLS),
+        "role_keywords": build_role_keywords(ROLE_SYNONYMS),
+        "field_config": build_field_config(field_config),
+    }
+
+
+# ========== Artifact ==========
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")
+
+
+def _atomic_write(path, write):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class Artifact:
+    def __init__(self, directory, manifest, taxonomy, role_matrix):
+        self.directory = directory
+        self.manifest = manifest
+        self.taxonomy = taxonomy
+        self.role_matrix = role_matrix
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        return self.taxonomy[key]
+
+    # ---- embeddings ----
+    def embeddings(self, model_name, table_name, names):
+        """Memory-mapped embedding matrix if one was saved for exactly these names."""
+        entry = self.manifest.get("embeddings", {}).get(f"{model_name}::{table_name}")
+        if not entry or self.directory is None or entry["names"] != list(names):
+            return None
+        path = os.path.join(self.directory, entry["file"])
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def save_embeddings(self, model_name, table_name, names, matrix):
+        if self.directory is None:
+            return
+        file_name = f"emb__{_slug(model_name)}__{_slug(table_name)}.npy"
+        with self._lock:
+            try:
+                _atomic_write(os.path.join(self.directory, file_name), lambda f: np.save(f, np.asarray(matrix)))
+                self.manifest.setdefault("embeddings", {})[f"{model_name}::{table_name}"] = {
+                    "file": file_name,
+                    "names": list(names),
+                    "shape": list(matrix.shape),
+                }
+                self._write_manifest()
+            except OSError as e:
+                print(f"⚠️ Could not save {model_name} embeddings to artifact: {e}")
+
+    def _write_manifest(self):
+        _atomic_write(
+            os.path.join(self.directory, "manifest.json"),
+            lambda f: f.write(json.dumps(self.manifest, indent=2).encode("utf-8"))
+        )
+
+
+def build_artifact(directory=None):
+    """Compile the config-derived parts and write them to the artifact directory."""
+    digest = config_hash()
+    directory = directory or os.path.join(ARTIFACT_DIR, digest)
+    taxonomy = _compile_taxonomy()
+    role_matrix = build_role_matrix(ROLE_BASED_SKILLS)
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "config_hash": digest,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "embeddings": {},
+    }
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _atomic_write(os.path.join(directory, "taxonomy.pkl"), lambda f: pickle.dump(taxonomy, f, protocol=pickle.HIGHEST_PROTOCOL))
+        _atomic_write(os.path.join(directory, "role_matrix.npy"), lambda f: np.save(f, role_matrix))
+        artifact = Artifact(directory, manifest, taxonomy, role_matrix)
+        artifact._write_manifest()
+        artifact.role_matrix = np.load(os.path.join(directory, "role_matrix.npy"), mmap_mode="r")
+        return artifact
+    except OSError as e:
+        # Read-only deploy: keep the compiled artifact in memory only
+        print(f"⚠️ Could not write startup artifact ({e}); using in-memory build")
+        return Artifact(None, manifest, taxonomy, role_matrix)
+
+
+def load_artifact(directory=None):
+    """Load the artifact for the current config, or None if missing/stale."""
+    digest = config_hash()
+    directory = directory or os.path.join(ARTIFACT_DIR, digest)
+    try:
+        with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != ARTIFACT_VERSION or manifest.get("config_hash") != digest:
+            return None
+        with open(os.path.join(directory, "taxonomy.pkl"), "rb") as f:
+            taxonomy = pickle.load(f)
+        if taxonomy["vocab"] != VOCAB.decode(range(TAXONOMY_SIZE)):
+            return None
+        role_matrix = np.load(os.path.join(directory, "role_matrix.npy"), mmap_mode="r")
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError):
+        return None
+    return Artifact(directory, manifest, taxonomy, role_matrix)
+
+
+def get_artifact():
+    """Process-wide artifact: loaded via mmap, rebuilt when the config hash changed."""
+    global _artifact
+    with _lock:
+        if _artifact is None:
+            _artifact = load_artifact() or build_artifact()
+        return _artifact
+
+
+# ========== CLI ==========
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] != "build":
+        print("usage: python -m utils.artifact build [--embeddings]")
+        return 2
+
+    global _artifact
+    start = time.time()
+    with _lock:
+        _artifact = build_artifact()
+    print(f"✅ Built taxonomy artifact in {_artifact.directory or '<memory>'}")
+
+    if "--embeddings" in argv:
+        # Goes through the normal table accessors, which save into the artifact
+        from jd_parser.skill_matcher import known_skill_embeddings
+        from resume_matcher.matcher import taxonomy_embeddings
+        for table in (known_skill_embeddings(), taxonomy_embeddings()):
+            if table is not None:
+                print(f"✅ Embedded {len(table)} skills")
+
+    print(f"⏱️ Done in {time.time() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+
+from resume_matcher.records import TIER_FULL, TIER_REDUCED, TIER_EXACT, TIER_LABELS
+
+# ========== Settings ==========
+# Default per-request budget in seconds; 0 means unlimited (always full quality)
+DEFAULT_LATENCY_BUDGET = float(os.getenv("SMARTSCREEN_LATENCY_BUDGET", "0"))
+REDUCE_AFTER = 0.5   # share of the budget spent before dropping to TIER_REDUCED
+EXACT_AFTER = 0.8    # share of the budget spent before dropping to TIER_EXACT
+
+
+# ========== Latency Budget ==========
+class LatencyBudget:
+    """
+    Picks the matching tier for the next resume so a run finishes inside
+    `seconds`. Two signals, the stricter one wins:
+
+    - elapsed share of the budget (REDUCE_AFTER / EXACT_AFTER), which works
+      even when the number of resumes is not known yet;
+    - projected finish time from the throughput so far and the resumes
+      still expected: over budget → reduced, over twice the budget → exact.
+
+    Tiers only ever step down within a run, so rankings do not flip between
+    quality levels as throughput fluctuates.
+    """
+
+    def __init__(self, seconds=None, expected=0):
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.expected = expected
+        self.done = 0
+        self._floor = TIER_FULL
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def expect(self, count=1):
+        with self._lock:
+            self.expected += count
+
+    def finished(self, count=1):
+        with self._lock:
+            self.done += count
+
+    def tier(self):
+        if self.seconds is None:
+            return TIER_FULL
+        with self._lock:
+            elapsed = self.elapsed
+            share = elapsed / self.seconds
+            tier = TIER_EXACT if share >= EXACT_AFTER else TIER_REDUCED if share >= REDUCE_AFTER else TIER_FULL
+
+            remaining = self.expected - self.done
+            if self.done and remaining > 0:
+                projected = elapsed + elapsed / self.done * remaining
+                if projected > 2 * self.seconds:
+                    tier = max(tier, TIER_EXACT)
+                elif projected > self.seconds:
+                    tier = max(tier, TIER_REDUCED)
+
+            self._floor = max(self._floor, tier)
+            return self._floor
+
+    def describe(self, tier_counts):
+        """Status-line note on the quality used, e.g. '⚡ 30s budget: Reduced 120, Exact only 40'."""
+        degraded = {TIER_LABELS[t]: n for t, n in sorted(tier_counts.items()) if t != TIER_FULL and n}
+        if self.seconds is None or not degraded:
+            return ""
+        return f"⚡ {self.seconds:g}s budget: " + ", ".join(f"{label} {n}" for label, n in degraded.items())
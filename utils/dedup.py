@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# ========== Settings ==========
+DEDUP_ENABLED = os.getenv("SMARTSCREEN_DEDUP", "1") != "0"
+DEDUP_THRESHOLD = float(os.getenv("SMARTSCREEN_DEDUP_THRESHOLD", "0.85"))   # estimated Jaccard of word 3-grams
+DEDUP_MAX_DOCS = int(os.getenv("SMARTSCREEN_DEDUP_MAX_DOCS", "5000"))      # documents indexed per run
+NUM_PERM = 128
+BANDS = 32           # 32 bands × 4 rows: pairs above ~0.42 Jaccard become candidates
+SHINGLE_SIZE = 3
+# Fewer distinct shingles than this (e.g. a scan that only yields "Curriculum
+# Vitae") says nothing about who the candidate is: never group such texts
+MIN_SHINGLES = int(os.getenv("SMARTSCREEN_DEDUP_MIN_SHINGLES", "20"))
+
+_PRIME = np.uint64(4294967291)   # largest prime below 2**32
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Fixed seed: signatures are comparable across processes and runs
+_rng = np.random.RandomState(20240521)
+_A = _rng.randint(1, 2 ** 31, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31, size=NUM_PERM).astype(np.uint64)
+
+
+# ========== MinHash ==========
+def _shingle_hashes(text):
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return np.empty(0, dtype=np.uint64)
+    word_ids = {}
+    hashes = np.fromiter(
+        (word_ids.setdefault(w, zlib.crc32(w.encode())) for w in words), dtype=np.uint64, count=len(words)
+    )
+    # Combine consecutive word hashes into one 32-bit hash per shingle
+    combined = np.zeros(len(hashes) - SHINGLE_SIZE + 1, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        combined = (combined * np.uint64(1000003) + hashes[offset:offset + len(combined)]) & np.uint64(0xFFFFFFFF)
+    return np.unique(combined)
+
+
+def minhash(text, min_shingles=MIN_SHINGLES):
+    """
+    NUM_PERM-wide MinHash signature of the text's word 3-grams
+    (whitespace/case/punctuation-insensitive), or None for texts with fewer
+    than min_shingles distinct shingles.
+    """
+    shingles = _shingle_hashes(text)
+    if len(shingles) < max(1, min_shingles):
+        return None
+    # (a·x + b) mod p for every permutation × shingle; operands < 2**31 · 2**32, so no uint64 overflow
+    return ((np.outer(_A, shingles) + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+# ========== LSH Index ==========
+class DuplicateIndex:
+    """
+    Near-duplicate lookup over MinHash signatures with LSH banding: two
+    documents are compared only if some band of their signatures is
+    identical, so a lookup costs a few dict probes instead of a scan.
+    The first document of a group is its representative.
+    """
+
+    def __init__(self, threshold=DEDUP_THRESHOLD, bands=BANDS, max_docs=DEDUP_MAX_DOCS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.max_docs = max_docs
+        self._signatures = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key):
+        return key in self._signatures
+
+    def _band_keys(self, signature):
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def find_or_add(self, key, text):
+        """
+        Key of the representative this text near-duplicates, or None after
+        indexing the text as a new representative (until max_docs is reached).
+        Texts too short to fingerprint are never grouped.
+        """
+        signature = minhash(text)
+        if signature is None:
+            return None
+        band_keys = self._band_keys(signature)
+
+        with self._lock:
+            best, best_score = None, self.threshold
+            seen = set()
+            for band, band_key in enumerate(band_keys):
+                for candidate in self._buckets[band].get(band_key, ()):
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    score = similarity(signature, self._signatures[candidate])
+                    if score >= best_score:
+                        best, best_score = candidate, score
+            if best is not None:
+                return best
+
+            if len(self._signatures) < self.max_docs:
+                self._signatures[key] = signature
+                for band, band_key in enumerate(band_keys):
+                    self._buckets[band].setdefault(band_key, []).append(key)
+            return None
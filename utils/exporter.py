@@ -0,0 +1,198 @@
+import atexit
+import csv
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+# ========== Export Columns ==========
+EXPORT_COLUMNS = [
+    "Resume", "Mobile", "Email", "Match %", "Match Summary", "Shortlist",
+    "JD Skills Matched", "Gaps", "Skill Evidence", "Duplicate Of", "Match Tier"
+]
+
+SUPPORTED_FORMATS = ("xlsx", "csv")
+
+# ========== Export Storage ==========
+# Exports hold candidate PII: keep them in a private (0700) directory, one file
+# per session, and delete anything nobody downloaded within EXPORT_TTL seconds.
+EXPORT_TTL = int(os.getenv("SMARTSCREEN_EXPORT_TTL", "3600"))
+EXPORT_DIR = os.getenv("SMARTSCREEN_EXPORT_DIR")
+if EXPORT_DIR:
+    os.makedirs(EXPORT_DIR, mode=0o700, exist_ok=True)
+else:
+    EXPORT_DIR = tempfile.mkdtemp(prefix="smartscreen_exports_")
+    _owner_pid = os.getpid()
+
+    @atexit.register
+    def _remove_export_dir():
+        # Forked workers share the directory; only the process that made it removes it
+        if os.getpid() == _owner_pid:
+            shutil.rmtree(EXPORT_DIR, ignore_errors=True)
+
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]\:\*\?\/\\]")
+
+
+# ✅ Flatten one MatchRecord into an export row (strings are built here, not kept)
+def record_to_row(record):
+    evidence = []
+    for skill, info in record.justification().items():
+        if info["source"]:
+            line = f"{skill} [{info['source']}]"
+            if info["trigger"]:
+                line += f" via '{info['trigger']}'"
+            if info["sentence"]:
+                line += f": {info['sentence']}"
+            evidence.append(line)
+
+    return [
+        record.name,
+        record.mobile,
+        record.email,
+        record.percent,
+        record.match_summary,
+        record.shortlist,
+        record.matched_display(),
+        ", ".join(record.gaps),
+        "\n".join(evidence),
+        record.duplicate_of or "",
+        record.tier_label,
+    ]
+
+
+def error_to_row(resume_name, error):
+    return [resume_name, "", "", 0, error, "🔴 Reject", "", "", "", "", ""]
+
+
+def discard_export(path):
+    """Delete an export this process wrote (anything outside EXPORT_DIR is left alone)."""
+    if not path or os.path.dirname(os.path.abspath(path)) != os.path.abspath(EXPORT_DIR):
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def sweep_exports(max_age=EXPORT_TTL):
+    """Delete exports older than max_age seconds, e.g. from sessions that never downloaded them."""
+    cutoff = time.time() - max_age
+    try:
+        entries = list(os.scandir(EXPORT_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+# ========== Streaming Exporter ==========
+class StreamingExporter:
+    """
+    Writes ranking rows to disk as they are produced, so memory stays flat
+    no matter how many resumes are exported.
+
+    - xlsx: openpyxl write-only workbook, one sheet per JD
+    - csv:  single file, the sheet title goes into a leading "Sheet" column
+    """
+
+    def __init__(self, fmt="xlsx", directory=EXPORT_DIR):
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        self.fmt = fmt
+        fd, self.path = tempfile.mkstemp(suffix=f".{fmt}", dir=directory)
+        os.close(fd)
+
+        self.rows_written = 0
+        self._sheets = {}   # key → sheet (xlsx) or None (csv)
+        self._titles = {}   # key → unique display title
+        self._closed = False
+
+        if fmt == "xlsx":
+            self._workbook = Workbook(write_only=True)
+        else:
+            self._csv_file = open(self.path, "w", newline="", encoding="utf-8-sig")
+            self._csv_writer = csv.writer(self._csv_file)
+            self._csv_writer.writerow(["Sheet"] + EXPORT_COLUMNS)
+
+    def _sheet_title(self, name):
+        # Excel sheet titles: max 31 chars, no []:*?/\ and unique per workbook
+        base = _INVALID_SHEET_CHARS.sub("_", name).strip() or "Sheet"
+        base = base[:31]
+        title = base
+        used = set(self._titles.values())
+        suffix = 2
+        while title in used:
+            tail = f" ({suffix})"
+            title = base[:31 - len(tail)] + tail
+            suffix += 1
+        return title
+
+    def add_sheet(self, key, title=None):
+        """
+        Register a sheet under `key` (any hashable, e.g. (position, JD name)),
+        titled `title` or str(key); clashing titles get a " (2)" suffix.
+        """
+        if key in self._sheets:
+            return key
+
+        title = self._sheet_title(title if title is not None else str(key))
+        if self.fmt == "xlsx":
+            sheet = self._workbook.create_sheet(title=title)
+            sheet.append(EXPORT_COLUMNS)
+        else:
+            sheet = None
+        self._titles[key] = title
+        self._sheets[key] = sheet
+        return key
+
+    def write_row(self, sheet_name, row):
+        if self._closed:
+            raise RuntimeError("Exporter already closed")
+        self.add_sheet(sheet_name)
+
+        if self.fmt == "xlsx":
+            self._sheets[sheet_name].append(row)
+        else:
+            self._csv_writer.writerow([self._titles[sheet_name]] + row)
+        self.rows_written += 1
+
+    def write_record(self, sheet_name, record):
+        self.write_row(sheet_name, record_to_row(record))
+
+    def write_batch(self, sheet_name, batch, indices=None):
+        """Write rows of a BatchScores (all, or the given indices in that order)."""
+        for record in batch.records(indices):
+            self.write_record(sheet_name, record)
+
+    def write_error(self, sheet_name, resume_name, error):
+        self.write_row(sheet_name, error_to_row(resume_name, error))
+
+    def close(self):
+        if self._closed:
+            return self.path
+
+        if self.fmt == "xlsx":
+            if not self._sheets:
+                self.add_sheet("Top Matches")
+            self._workbook.save(self.path)
+            self._workbook = None
+        else:
+            self._csv_file.close()
+
+        self._closed = True
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,278 @@
+import io
+import mmap
+import os
+import re
+import struct
+import zipfile
+from contextlib import contextmanager
+from itertools import islice
+
+from jd_parser.extractor import extract_text_from_pdf, extract_text_from_docx, extract_text_from_txt
+
+# ========== Limits ==========
+MAX_MEMBER_BYTES = 50 * 1024 * 1024   # skip archive members bigger than this (zip bombs)
+SNIFF_BYTES = 1024
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+# XML/HTML/SVG parts (e.g. members of an unpacked Office file) are markup, not plain text
+_MARKUP = re.compile(rb"^(?:\xef\xbb\xbf)?\s*<(?:\?xml|!doctype|!--|[a-z][\w:.-]*[\s/>])", re.IGNORECASE)
+
+
+# ========== Zero-copy Reader ==========
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only file object over a memoryview (no copy of the underlying mmap)."""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        self._view = memoryview(b"")
+        super().close()
+
+
+# ========== Source Documents ==========
+class SourceDocument:
+    """
+    A lazily opened input document. Nothing is read until open() is called,
+    so a generator of these can describe a 1,000-file archive cheaply.
+    """
+    __slots__ = ("name", "_opener")
+
+    def __init__(self, name, opener):
+        self.name = name
+        self._opener = opener
+
+    def open(self):
+        return self._opener()
+
+    def __repr__(self):
+        return f"SourceDocument({self.name!r})"
+
+
+@contextmanager
+def _open_path(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield io.BytesIO(b"")
+            return
+        # ✅ Memory-map instead of copying the file into a bytes object
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            reader = _BufferReader(view)
+            try:
+                yield reader
+            finally:
+                reader.close()
+                view.release()
+
+
+@contextmanager
+def _open_bytes(data):
+    yield io.BytesIO(data)
+
+
+@contextmanager
+def _open_member(zf, info, archive_view):
+    if info.compress_type == zipfile.ZIP_STORED and archive_view is not None:
+        # Stored members are a plain byte range of the mapped archive: slice, don't copy
+        header = _LOCAL_HEADER.unpack_from(archive_view, info.header_offset)
+        start = info.header_offset + _LOCAL_HEADER.size + header[-2] + header[-1]
+        reader = _BufferReader(archive_view[start:start + info.file_size])
+    else:
+        reader = io.BytesIO(zf.read(info))
+    try:
+        yield reader
+    finally:
+        reader.close()
+
+
+def _sniff(buffer):
+    head = buffer.read(SNIFF_BYTES)
+    buffer.seek(0)
+    return head
+
+
+def detect_kind(head, buffer=None):
+    """Classify a document by its leading bytes rather than its file extension."""
+    if not head:
+        return "empty"
+    if head.startswith(b"%PDF") or b"%PDF-" in head:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return _zip_kind(buffer) if buffer is not None else "zip"
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        return "ole"  # legacy .doc / .xls
+    if b"\x00" in head:
+        return "binary"
+    if _MARKUP.match(head):
+        return "markup"
+    return "txt"
+
+
+def _container_kind(names):
+    """'docx', 'office' (xlsx/pptx/odt/… — one document, not an archive) or 'zip'."""
+    if "word/document.xml" in names:
+        return "docx"
+    if "[Content_Types].xml" in names or "mimetype" in names:
+        return "office"
+    return "zip"
+
+
+def _zip_kind(buffer):
+    try:
+        with zipfile.ZipFile(buffer) as zf:
+            return _container_kind(zf.NameToInfo)
+    except zipfile.BadZipFile:
+        return "binary"
+    finally:
+        buffer.seek(0)
+
+
+# ========== Expansion ==========
+def _error_opener(message):
+    def opener():
+        raise ValueError(message)
+    return opener
+
+
+def _iter_archive(zf, archive_view):
+    for info in zf.infolist():
+        member_name = os.path.basename(info.filename)
+        if info.is_dir() or not member_name or member_name.startswith(".") or info.filename.startswith("__MACOSX/"):
+            continue
+        if info.flag_bits & 0x1:
+            yield SourceDocument(member_name, _error_opener("Encrypted archive member"))
+        elif info.file_size > MAX_MEMBER_BYTES:
+            yield SourceDocument(member_name, _error_opener("Archive member too large"))
+        else:
+            yield SourceDocument(member_name, lambda i=info: _open_member(zf, i, archive_view))
+
+
+def _iter_path(path):
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for file_name in sorted(files):
+                if not file_name.startswith("."):
+                    yield from _iter_path(os.path.join(root, file_name))
+        return
+
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+        if head.startswith(b"PK\x03\x04"):
+            archive_view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            archive_view = None
+
+    if archive_view is not None:
+        try:
+            zf = zipfile.ZipFile(_BufferReader(archive_view))
+        except zipfile.BadZipFile:
+            zf = None
+        if zf is not None and _container_kind(zf.NameToInfo) == "zip":
+            # Members keep zf/archive_view alive until the last one is processed
+            yield from _iter_archive(zf, archive_view)
+            return
+        # Word/Office containers and corrupt zips are one document each
+        if zf is not None:
+            zf.close()
+        archive_view.release()
+
+    yield SourceDocument(os.path.basename(path), lambda: _open_path(path))
+
+
+def _source_path(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return getattr(source, "name", None)
+
+
+def iter_documents(sources):
+    """
+    Expand uploads, paths, directories and ZIP archives into a lazy stream of
+    SourceDocument objects. Archives are read in place, never unpacked to disk.
+    """
+    if sources is None:
+        return
+    if not isinstance(sources, (list, tuple)):
+        sources = [sources]
+
+    for source in sources:
+        if isinstance(source, SourceDocument):
+            yield source
+            continue
+
+        path = _source_path(source)
+        if path and os.path.exists(path):
+            yield from _iter_path(path)
+        elif hasattr(source, "read"):
+            data = source.read()
+            yield SourceDocument(os.path.basename(path or "upload"), lambda d=data: _open_bytes(d))
+        else:
+            yield SourceDocument(os.path.basename(path or "upload"), _error_opener("Could not read file content."))
+
+
+# ========== Text Extraction ==========
+def extract_document_text(document):
+    """Returns (text, error) for a SourceDocument, dispatching on magic bytes."""
+    try:
+        with document.open() as buffer:
+            kind = detect_kind(_sniff(buffer), buffer)
+
+            if kind == "empty":
+                return None, "❌ File is empty."
+            if kind == "pdf":
+                return extract_text_from_pdf(buffer), None
+            if kind == "docx":
+                return extract_text_from_docx(buffer), None
+            if kind == "txt":
+                return extract_text_from_txt(buffer), None
+            if kind == "zip":
+                return None, "❌ Nested archives are not supported."
+            return None, "❌ Unsupported file format."
+    except Exception as e:
+        return None, f"❌ Extraction failed: {str(e)}"
+
+
+def extract_text(file):
+    """Returns (text, error) for a single upload, path or SourceDocument."""
+    if isinstance(file, SourceDocument):
+        return extract_document_text(file)
+    documents = iter_documents(file)
+    try:
+        found = list(islice(documents, 2))
+    finally:
+        documents.close()
+    if not found:
+        return None, "❌ Could not read file content."
+    if len(found) > 1:
+        return None, "❌ Expected a single document, got an archive with several files."
+    return extract_document_text(found[0])
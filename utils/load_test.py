@@ -0,0 +1,415 @@
+"""
+Concurrent-user load test for the SmartScreen.AI handlers.
+
+    python -m utils.load_test --levels 1,5,20 --resumes 25 --save baseline.json
+    python -m utils.load_test --levels 1,5,20 --resumes 25 --compare baseline.json
+    python -m utils.load_test --target server --url http://127.0.0.1:7860 --server-pid <pid>
+
+Each concurrency level runs N simulated recruiters pressing "Compare" at the
+same time against a synthetic JD/resume corpus and reports latency
+percentiles, throughput, error rate and peak RSS. Runs are fully offline:
+the in-process target imports app.py without launching it, the server
+target talks to a local instance through gradio_client.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Never reach out to the Hugging Face hub or Gradio telemetry during a load test
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+os.environ.setdefault("GRADIO_ANALYTICS_ENABLED", "False")
+
+from config.skills import ROLE_BASED_SKILLS, ACTION_VERBS, EXPERIENCE_HEADERS
+
+SCENARIOS = ("single", "multi")
+PERCENTILES = (50, 90, 95, 99)
+REGRESSION_TOLERANCE = 0.20
+
+
+# ========== Synthetic Corpus ==========
+def _skills_for(rng, role, count):
+    own = list(ROLE_BASED_SKILLS[role])
+    other = [s for skills in ROLE_BASED_SKILLS.values() for s in skills]
+    picked = rng.sample(own, min(len(own), count))
+    # A few off-role skills so scores spread out instead of all being 100%
+    picked += rng.sample(other, min(len(other), max(1, count // 4)))
+    return picked
+
+
+def synthetic_jd(rng, role):
+    skills = _skills_for(rng, role, 10)
+    return "\n".join([
+        f"Role: {role}",
+        f"Experience: {rng.randint(1, 5)}-{rng.randint(6, 10)} years",
+        "Location: Chennai",
+        "Notice Period: 30 days",
+        "",
+        "Required Skills:",
+        *[f"- {skill}" for skill in skills],
+    ])
+
+
+def synthetic_resume(rng, index, role, session=None):
+    # The session id makes every session's texts unique, so concurrent sessions
+    # never share annotation-cache entries the way real recruiters wouldn't
+    candidate = f"{index}" if session is None else f"{session}-{index}"
+    skills = _skills_for(rng, role, rng.randint(3, 15))
+    lines = [
+        f"Candidate {candidate}",
+        f"Mobile: +91 9{rng.randint(100000000, 999999999)}",
+        f"Email: candidate{candidate}@example.com",
+        "",
+        "Skills",
+        ", ".join(skills),
+        "",
+        rng.choice(EXPERIENCE_HEADERS).title(),
+    ]
+    for skill in rng.sample(skills, max(1, len(skills) // 2)):
+        lines.append(f"{rng.choice(ACTION_VERBS).capitalize()} services using {skill} for a client project.")
+    return "\n".join(lines)
+
+
+def _write(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def build_corpus(directory, jds=3, resumes=20, seed=7, session=None):
+    """
+    Write a reproducible JD/resume corpus as .txt files; returns (jd_paths, resume_paths).
+    With a session number the resumes carry it in their file names and
+    candidate lines; skills and section layout are the same for every session.
+    """
+    rng = random.Random(seed)
+    roles = list(ROLE_BASED_SKILLS)
+    prefix = "" if session is None else f"s{session:03d}_"
+
+    jd_paths = [_write(directory, f"jd_{i:03d}.txt", synthetic_jd(rng, rng.choice(roles))) for i in range(jds)]
+    resume_paths = [
+        _write(directory, f"{prefix}resume_{i:04d}.txt", synthetic_resume(rng, i, rng.choice(roles), session))
+        for i in range(resumes)
+    ]
+    return jd_paths, resume_paths
+
+
+def session_corpora(directory, sessions, jds=3, resumes=20, seed=7):
+    """
+    One resume corpus per session with unique file names and content, so a
+    session that gets back another session's rows is caught and sessions
+    don't warm each other's caches.
+    """
+    corpora = []
+    for session in range(sessions):
+        session_dir = os.path.join(directory, f"session_{session:03d}")
+        os.makedirs(session_dir, exist_ok=True)
+        corpora.append(build_corpus(session_dir, jds=jds, resumes=resumes, seed=seed, session=session)[1])
+    return corpora
+
+
+_RESUME_NAME = re.compile(r"s\d{3}_resume_\d{4}\.txt")
+
+
+def check_names(names, resume_paths, expected_count=None):
+    """Every returned resume must be one of this session's, each at most once."""
+    own = {os.path.basename(p) for p in resume_paths}
+    foreign = sorted(set(names) - own)
+    if foreign:
+        raise RuntimeError(f"rows from another session: {foreign[:3]}")
+    if len(names) != len(set(names)):
+        raise RuntimeError("a resume came back more than once")
+    if expected_count is not None and len(names) != expected_count:
+        raise RuntimeError(f"expected {expected_count} rows, got {len(names)}")
+
+
+# ========== Targets ==========
+class InProcessTarget:
+    """Calls the app's click handlers directly (app.py is imported, not launched)."""
+
+    def __init__(self):
+        import app
+        self.app = app
+
+    def run(self, scenario, jd_paths, resume_paths):
+        if scenario == "single":
+            rows, status, export_path = self.app.compare_jd_multiple_resumes(jd_paths[0], resume_paths)
+            self.app.discard_export(export_path)
+            if not status.startswith("✅"):
+                raise RuntimeError(status or "empty status")
+            # Every resume of this session must come back exactly once (up to the
+            # retained top-k), and nothing from a concurrent session
+            check_names([row[0] for row in rows], resume_paths, min(len(resume_paths), self.app.TOP_K))
+        else:
+            html, status, _, export_path = self.app.compare_multiple_jds_with_export(jd_paths, resume_paths)
+            self.app.discard_export(export_path)
+            if not status.startswith("✅"):
+                raise RuntimeError(status or "empty status")
+            check_names(sorted(set(_RESUME_NAME.findall(html))), resume_paths)
+
+    def rss_pid(self):
+        return os.getpid()
+
+
+class ServerTarget:
+    """Drives a running local instance through its Gradio API."""
+
+    API_NAMES = {"single": "/compare_jd_multiple_resumes", "multi": "/compare_multiple_jds_with_export"}
+
+    def __init__(self, url, pid=None):
+        from gradio_client import Client, handle_file
+        self.url = url
+        self.pid = pid
+        self._handle_file = handle_file
+        self._local = threading.local()
+        self._client_cls = Client
+
+    def _client(self):
+        # One client per simulated session, like one browser tab per recruiter
+        if getattr(self._local, "client", None) is None:
+            self._local.client = self._client_cls(self.url, verbose=False)
+        return self._local.client
+
+    def run(self, scenario, jd_paths, resume_paths):
+        resumes = [self._handle_file(p) for p in resume_paths]
+        if scenario == "single":
+            result = self._client().predict(self._handle_file(jd_paths[0]), resumes, api_name=self.API_NAMES[scenario])
+        else:
+            jds = [self._handle_file(p) for p in jd_paths]
+            result = self._client().predict(jds, resumes, api_name=self.API_NAMES[scenario])
+        status = result[1] if isinstance(result, (list, tuple)) and len(result) > 1 else ""
+        if not str(status).startswith("✅"):
+            raise RuntimeError(str(status) or "empty status")
+        if scenario == "single":
+            grid = result[0]["data"] if isinstance(result[0], dict) else result[0]
+            check_names([row[0] for row in grid], resume_paths)
+        else:
+            check_names(sorted(set(_RESUME_NAME.findall(str(result[0])))), resume_paths)
+
+    def rss_pid(self):
+        return self.pid
+
+
+# ========== Memory Sampling ==========
+def _rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid == os.getpid():
+        import resource
+        # ru_maxrss is the lifetime peak (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+class RSSSampler:
+    """Background thread tracking the peak resident set size of one process."""
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while True:
+            rss = _rss_bytes(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        if self.pid is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+# ========== Runner ==========
+def run_level(target, scenario, concurrency, iterations, jd_paths, corpora):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency)
+
+    def session(index):
+        barrier.wait()  # everyone presses the button at the same moment
+        for _ in range(iterations):
+            start = time.perf_counter()
+            try:
+                target.run(scenario, jd_paths, corpora[index])
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}")
+
+    with RSSSampler(target.rss_pid()) as sampler:
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(session, range(concurrency)))
+        wall = time.perf_counter() - wall_start
+
+    total = concurrency * iterations
+    result = {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "error_rate": len(errors) / total if total else 0.0,
+        "wall_seconds": wall,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "resumes_per_second": len(latencies) * len(corpora[0]) / wall if wall else 0.0,
+        "peak_rss_mb": sampler.peak / (1024 * 1024) if sampler.peak else None,
+        "sample_errors": sorted(set(errors))[:5],
+    }
+    if latencies:
+        values = np.percentile(np.asarray(latencies), PERCENTILES)
+        result.update({f"p{p}_seconds": float(v) for p, v in zip(PERCENTILES, values)})
+        result["mean_seconds"] = float(np.mean(latencies))
+        result["max_seconds"] = float(np.max(latencies))
+    return result
+
+
+# ========== Reporting ==========
+def _fmt(value, spec=".2f"):
+    return "-" if value is None else format(value, spec)
+
+
+def print_report(report):
+    print(f"\n📊 {report['target']} · {report['scenario']} · {report['resumes']} resumes × {report['jds']} JDs")
+    print(f"{'users':>6} {'reqs':>6} {'err%':>6} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'req/s':>8} {'cv/s':>8} {'RSS MB':>8}")
+    for level in report["levels"]:
+        print(
+            f"{level['concurrency']:>6} {level['requests']:>6} {level['error_rate'] * 100:>6.1f} "
+            f"{_fmt(level.get('p50_seconds')):>8} {_fmt(level.get('p95_seconds')):>8} {_fmt(level.get('p99_seconds')):>8} "
+            f"{_fmt(level['throughput_rps']):>8} {_fmt(level['resumes_per_second'], '.1f'):>8} "
+            f"{_fmt(level['peak_rss_mb'], '.0f'):>8}"
+        )
+        for error in level["sample_errors"]:
+            print(f"       ❌ {error}")
+
+
+def compare_reports(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Print per-level deltas against a saved baseline; returns True if anything regressed."""
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    checks = (
+        ("p95_seconds", "p95", True),
+        ("throughput_rps", "req/s", False),
+        ("peak_rss_mb", "RSS", True),
+    )
+    regressed = False
+
+    print(f"\n🔁 Compared with baseline from {baseline.get('created', '?')} (tolerance {tolerance:.0%})")
+    for level in current["levels"]:
+        old = previous.get(level["concurrency"])
+        if old is None:
+            print(f"{level['concurrency']:>6} users: no baseline")
+            continue
+        parts = []
+        for key, label, lower_is_better in checks:
+            new_value, old_value = level.get(key), old.get(key)
+            if not new_value or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            worse = change > tolerance if lower_is_better else change < -tolerance
+            regressed |= worse
+            parts.append(f"{label} {change:+.0%}{' ⚠️' if worse else ''}")
+        if level["error_rate"] > old.get("error_rate", 0.0):
+            regressed = True
+            parts.append(f"errors {old.get('error_rate', 0.0):.0%} → {level['error_rate']:.0%} ⚠️")
+        print(f"{level['concurrency']:>6} users: " + ", ".join(parts))
+
+    print("❌ Regression against baseline" if regressed else "✅ Within baseline tolerance")
+    return regressed
+
+
+# ========== CLI ==========
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.load_test", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", choices=("inprocess", "server"), default="inprocess")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{os.getenv('SMARTSCREEN_PORT', '7860')}")
+    parser.add_argument("--server-pid", type=int, help="server process to sample RSS from (server target)")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="single")
+    parser.add_argument("--levels", default="1,5,10,20", help="comma-separated concurrent session counts")
+    parser.add_argument("--iterations", type=int, default=2, help="requests per session per level")
+    parser.add_argument("--jds", type=int, default=3)
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--corpus", help="directory for the synthetic corpus (default: temp dir)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed requests before the first level")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare results against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="smartscreen_load_") as tmp:
+        corpus_dir = args.corpus or tmp
+        os.makedirs(corpus_dir, exist_ok=True)
+        jd_paths, resume_paths = build_corpus(corpus_dir, jds=args.jds, resumes=args.resumes, seed=args.seed)
+        corpora = session_corpora(corpus_dir, max(levels, default=1), jds=args.jds, resumes=args.resumes, seed=args.seed)
+
+        load_start = time.time()
+        target = InProcessTarget() if args.target == "inprocess" else ServerTarget(args.url, args.server_pid)
+        print(f"✅ {args.target} target ready in {time.time() - load_start:.1f}s")
+
+        for _ in range(args.warmup):
+            target.run(args.scenario, jd_paths, resume_paths)
+
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "target": args.target,
+            "scenario": args.scenario,
+            "jds": len(jd_paths),
+            "resumes": len(resume_paths),
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "cpu_count": os.cpu_count(),
+            "levels": [],
+        }
+        for concurrency in levels:
+            print(f"⏱️ {concurrency} concurrent sessions...")
+            report["levels"].append(
+                run_level(target, args.scenario, concurrency, args.iterations, jd_paths, corpora)
+            )
+
+    print_report(report)
+
+    regressed = False
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressed = compare_reports(report, json.load(f), args.tolerance)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved results to {args.save}")
+
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# ========== Model Names ==========
+SPACY_MODEL = "en_core_web_sm"
+MINILM_MODEL = "paraphrase-MiniLM-L6-v2"
+JOBBERT_MODEL = "TechWolf/JobBERT-v2"
+
+# ========== Registry ==========
+# One instance of every model per process. In prefork mode they are loaded
+# in the parent before fork() so workers share the weights copy-on-write.
+_lock = threading.RLock()
+_nlp = {}
+_sentence_models = {}
+_embedding_tables = {}
+
+# ✅ Trimmed spaCy pipelines: each task loads only the components it reads
+_SPACY_COMPONENTS = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+NLP_TASKS = {
+    "tokens": [],                                                # is_stop / is_punct are lexical
+    "sentences": ["senter"],                                     # senter instead of the parser
+    "noun_chunks": ["tok2vec", "tagger", "attribute_ruler", "parser"],
+    "entities": ["ner"],
+}
+# In en_core_web_sm senter and ner embed with their own internal tok2vec;
+# only tagger/parser listen to the shared one.
+
+
+def _listens_to_tok2vec(nlp):
+    from spacy.pipeline.tok2vec import Tok2VecListener
+    return any(
+        isinstance(node, Tok2VecListener)
+        for _, pipe in nlp.pipeline if hasattr(pipe, "model")
+        for node in pipe.model.walk()
+    )
+
+
+def get_nlp(name=SPACY_MODEL, task=None):
+    """Full pipeline by default; with task, a pipeline holding only that task's components."""
+    key = (name, task)
+    with _lock:
+        if key not in _nlp:
+            import spacy
+            if task is None:
+                _nlp[key] = spacy.load(name)
+            else:
+                keep = NLP_TASKS[task]
+                nlp = spacy.load(name, exclude=[c for c in _SPACY_COMPONENTS if c not in keep])
+                if "tok2vec" not in keep and _listens_to_tok2vec(nlp):
+                    # Another model whose components do share the tok2vec: keep it after all
+                    keep = keep + ["tok2vec"]
+                    nlp = spacy.load(name, exclude=[c for c in _SPACY_COMPONENTS if c not in keep])
+                for component in keep:
+                    if component in nlp.disabled:
+                        nlp.enable_pipe(component)
+                _nlp[key] = nlp
+        return _nlp[key]
+
+
+def model_labels(name=SPACY_MODEL, component="ner"):
+    """A component's labels from the installed model's meta.json, without loading the model."""
+    import spacy
+    try:
+        meta = spacy.util.load_meta(spacy.util.get_package_path(name) / "meta.json")
+    except (ImportError, OSError, ValueError):
+        # Not an installed package (e.g. a model directory): fall back to loading it
+        nlp = get_nlp(name, task="entities")
+        return set(nlp.get_pipe(component).labels) if nlp.has_pipe(component) else set()
+    return set(meta.get("labels", {}).get(component, ()))
+
+
+def get_sentence_model(name, required=True):
+    """Loaded and warmed SentenceTransformer, or None if optional and loading failed."""
+    with _lock:
+        if name not in _sentence_models:
+            try:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(name, device="cpu")
+                model.encode(["SmartScreen.AI Warm-up"], convert_to_tensor=True)
+            except Exception as e:
+                if required:
+                    raise
+                print(f"❌ {name} loading failed: {e}")
+                model = None
+            _sentence_models[name] = model
+        return _sentence_models[name]
+
+
+# ========== Embedding Tables ==========
+class EmbeddingTable:
+    """
+    Read-only matrix of L2-normalized embeddings for a fixed list of names,
+    so cosine similarity is a plain dot product.
+    """
+    __slots__ = ("names", "index", "matrix", "_shm")
+
+    def __init__(self, names, matrix):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.matrix = matrix
+        self.matrix.flags.writeable = False
+        self._shm = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows(self, names):
+        """Embeddings for names, or None for names not in the table."""
+        return [self.matrix[self.index[n]] if n in self.index else None for n in names]
+
+    def to_shared(self):
+        """Move the matrix into a shared-memory block that forked workers map, not copy."""
+        if self._shm is not None or not self.matrix.nbytes or isinstance(self.matrix, np.memmap):
+            # memmap'd artifact pages are already shared through the page cache
+            return self
+        shm = shared_memory.SharedMemory(create=True, size=self.matrix.nbytes)
+        shared = np.ndarray(self.matrix.shape, dtype=self.matrix.dtype, buffer=shm.buf)
+        shared[...] = self.matrix
+        shared.flags.writeable = False
+        self.matrix = shared
+        self._shm = shm
+        return self
+
+    def release(self, unlink=False):
+        if self._shm is not None:
+            self.matrix = np.array(self.matrix)
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+            self._shm = None
+
+
+def encode_normalized(model, texts):
+    return np.asarray(
+        model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True),
+        dtype=np.float32
+    )
+
+
+def get_embedding_table(model_name, table_name, names):
+    """
+    Embed names once per process (or once in the prefork parent) and cache.
+    Tables saved in the startup artifact are memory-mapped instead of encoded.
+    """
+    from utils.artifact import get_artifact
+
+    key = (model_name, table_name)
+    with _lock:
+        if key not in _embedding_tables:
+            names = list(names)
+            artifact = get_artifact()
+            matrix = artifact.embeddings(model_name, table_name, names)
+            if matrix is None:
+                model = get_sentence_model(model_name, required=False)
+                if model is None:
+                    return None
+                matrix = encode_normalized(model, names) if names else np.zeros((0, 0), dtype=np.float32)
+                artifact.save_embeddings(model_name, table_name, names, matrix)
+            _embedding_tables[key] = EmbeddingTable(names, matrix)
+        return _embedding_tables[key]
+
+
+def warm_up_models(names=(MINILM_MODEL, JOBBERT_MODEL)):
+    """Load the sentence transformers ahead of the first request (run in a background thread)."""
+    for name in names:
+        get_sentence_model(name, required=False)
+
+
+def share_embedding_tables():
+    with _lock:
+        for table in _embedding_tables.values():
+            table.to_shared()
+
+
+def release_embedding_tables(unlink=False):
+    with _lock:
+        for table in _embedding_tables.values():
+            table.release(unlink=unlink)
@@ -0,0 +1,135 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# ========== Settings ==========
+N_PROCESS = int(os.getenv("SMARTSCREEN_SPACY_PROCESSES", "1"))
+BATCH_SIZE = int(os.getenv("SMARTSCREEN_SPACY_BATCH_SIZE", "64"))
+CACHE_SIZE = int(os.getenv("SMARTSCREEN_ANNOTATION_CACHE", "2048"))
+
+# ========== Task Registry ==========
+# task name → (batch_fn(texts, n_process, batch_size) -> list of values, run in annotate_batch by default)
+# Modules that own an NLP step register it here, so this module stays free of
+# their imports and every stage reuses the same per-document annotations.
+_tasks = {}
+
+
+def register_task(name, batch_fn, default=True):
+    _tasks[name] = (batch_fn, default)
+
+
+# ========== Annotation Cache ==========
+class AnnotationCache:
+    """
+    Bounded LRU of text → {task: value}. A run can pin its documents for as
+    long as it re-reads their annotations: pinned entries sit outside the LRU,
+    so they neither get evicted mid-run nor push out other runs' entries, and
+    they are dropped as soon as the last run pinning them unpins.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._pinned = {}   # text → [pin count, entry]
+        self._lock = threading.Lock()
+
+    def get(self, text, task):
+        with self._lock:
+            pinned = self._pinned.get(text)
+            if pinned is not None:
+                return pinned[1].get(task)
+            entry = self._entries.get(text)
+            if entry is None or task not in entry:
+                return None
+            self._entries.move_to_end(text)
+            return entry[task]
+
+    def put(self, text, task, value):
+        with self._lock:
+            pinned = self._pinned.get(text)
+            if pinned is not None:
+                pinned[1][task] = value
+                return
+            entry = self._entries.get(text)
+            if entry is None:
+                entry = self._entries[text] = {}
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(text)
+            entry[task] = value
+
+    def pin(self, texts):
+        with self._lock:
+            for text in texts:
+                pinned = self._pinned.get(text)
+                if pinned is None:
+                    self._pinned[text] = [1, self._entries.pop(text, None) or {}]
+                else:
+                    pinned[0] += 1
+
+    def unpin(self, texts):
+        with self._lock:
+            for text in texts:
+                pinned = self._pinned.get(text)
+                if pinned is not None:
+                    pinned[0] -= 1
+                    if pinned[0] <= 0:
+                        del self._pinned[text]
+
+    def discard(self, text):
+        with self._lock:
+            self._entries.pop(text, None)
+
+    def missing(self, texts, task):
+        with self._lock:
+            return [
+                t for t in texts
+                if task not in (self._pinned[t][1] if t in self._pinned else self._entries.get(t, ()))
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+ANNOTATIONS = AnnotationCache()
+
+
+@contextmanager
+def pinned_annotations(texts):
+    """Keep the annotations of `texts` cached for the duration of a run, then free them."""
+    texts = list(dict.fromkeys(t for t in texts if t))
+    ANNOTATIONS.pin(texts)
+    try:
+        yield
+    finally:
+        ANNOTATIONS.unpin(texts)
+
+
+def annotation(text, task):
+    """Cached annotation for one document, computing it (as a batch of one) if needed."""
+    value = ANNOTATIONS.get(text, task)
+    if value is None:
+        batch_fn, _ = _tasks[task]
+        value = batch_fn([text], 1, 1)[0]
+        ANNOTATIONS.put(text, task, value)
+    return value
+
+
+def annotate_batch(texts, tasks=None, n_process=N_PROCESS, batch_size=BATCH_SIZE):
+    """
+    Run every requested task over all texts of a run with nlp.pipe, so
+    downstream stages hit the cache instead of parsing one document at a time.
+    """
+    texts = list(dict.fromkeys(t for t in texts if t))
+    names = tasks if tasks is not None else [name for name, (_, default) in _tasks.items() if default]
+
+    for name in names:
+        todo = ANNOTATIONS.missing(texts, name)
+        if not todo:
+            continue
+        batch_fn, _ = _tasks[name]
+        for text, value in zip(todo, batch_fn(todo, n_process, batch_size)):
+            ANNOTATIONS.put(text, name, value)
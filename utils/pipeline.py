@@ -0,0 +1,195 @@
+import os
+import queue
+import threading
+
+# ========== Settings ==========
+QUEUE_SIZE = int(os.getenv("SMARTSCREEN_QUEUE_SIZE", "32"))
+MEMORY_BUDGET_MB = int(os.getenv("SMARTSCREEN_MEMORY_BUDGET_MB", "256"))
+TOP_K = int(os.getenv("SMARTSCREEN_TOP_K", "500"))
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+# ========== Memory Budget ==========
+class MemoryBudget:
+    """
+    Counting semaphore over bytes. Stages acquire the size of what they are
+    about to hold and release it once it has been reduced to a summary, so
+    the bytes in flight never exceed the limit however large the batch is.
+    A single item larger than the whole budget is let through on its own.
+    """
+
+    def __init__(self, limit_bytes):
+        self.limit = limit_bytes
+        self.used = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size, cancelled=None):
+        with self._cond:
+            while self.used and self.used + size > self.limit:
+                if cancelled is not None and cancelled.is_set():
+                    return False
+                self._cond.wait(_POLL_SECONDS)
+            self.used += size
+            self.peak = max(self.peak, self.used)
+            return True
+
+    def release(self, size):
+        with self._cond:
+            self.used = max(0, self.used - size)
+            self._cond.notify_all()
+
+
+# ========== Staged Pipeline ==========
+class _Stage:
+    def __init__(self, fn, workers, batch_size, name):
+        self.fn = fn
+        self.workers = workers
+        self.batch_size = batch_size
+        self.name = name
+
+
+class StreamingPipeline:
+    """
+    source → stage → stage → … → consumer, every hop a bounded queue.
+
+    A stage fn takes one item and returns the next item (None drops it); a
+    batched stage takes a list and returns a list. When the consumer falls
+    behind, queues fill up and upstream stages block — backpressure all the
+    way back to the source iterator. The first exception raised in a stage
+    cancels the pipeline and is re-raised from run().
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.stages = []
+        self.cancelled = threading.Event()
+        self._error = None
+
+    def stage(self, fn, workers=1, name=None):
+        self.stages.append(_Stage(fn, workers, None, name or fn.__name__))
+        return self
+
+    def batch_stage(self, fn, batch_size, name=None):
+        self.stages.append(_Stage(fn, 1, batch_size, name or fn.__name__))
+        return self
+
+    # ---- queue helpers that give up once cancelled ----
+    def _put(self, q, item):
+        while not self.cancelled.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self.cancelled.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        self.cancelled.set()
+
+    # ---- threads ----
+    def _feed(self, source, out):
+        try:
+            for item in source:
+                if not self._put(out, item):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(out, _DONE)
+
+    def _work(self, stage, inq, out, remaining, lock):
+        try:
+            while True:
+                item = self._get(inq)
+                if item is _DONE:
+                    self._put(inq, _DONE)  # let sibling workers see it too
+                    break
+                result = stage.fn(item)
+                if result is not None and not self._put(out, result):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._put(out, _DONE)
+
+    def _work_batched(self, stage, inq, out):
+        try:
+            finished = False
+            while not finished:
+                item = self._get(inq)
+                if item is _DONE:
+                    break
+                batch = [item]
+                # Take whatever is already waiting, never wait for a full batch
+                while len(batch) < stage.batch_size:
+                    try:
+                        item = inq.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        finished = True
+                        break
+                    batch.append(item)
+                for result in stage.fn(batch):
+                    if result is not None and not self._put(out, result):
+                        return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(out, _DONE)
+
+    def run(self, source):
+        """Yield the last stage's outputs as they complete (not in input order)."""
+        # Stage threads remember the thread that ran the pipeline, so a profiler can
+        # tell this request's workers from a concurrent session's
+        owner = threading.get_ident()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0]), name="pipeline-source", daemon=True)]
+
+        for i, stage in enumerate(self.stages):
+            inq, out = queues[i], queues[i + 1]
+            if stage.batch_size:
+                threads.append(threading.Thread(
+                    target=self._work_batched, args=(stage, inq, out), name=f"pipeline-{stage.name}", daemon=True
+                ))
+                continue
+            remaining, lock = [stage.workers], threading.Lock()
+            for w in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, inq, out, remaining, lock),
+                    name=f"pipeline-{stage.name}-{w}", daemon=True
+                ))
+
+        for thread in threads:
+            thread.owner = owner
+            thread.start()
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Consumer finished or bailed out early: stop every stage
+            self.cancelled.set()
+            for thread in threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,90 @@
+import gc
+import os
+import signal
+
+from utils.models import share_embedding_tables, release_embedding_tables, warm_up_models
+
+
+# ========== Preload ==========
+def preload():
+    """
+    Load every model and taxonomy embedding table in this (parent) process,
+    move the tables into shared memory and freeze the heap so forked workers
+    keep sharing those pages instead of copying them.
+    """
+    # Importing these modules loads the spaCy pipelines; the transformers are
+    # loaded here, before fork, instead of lazily in every worker
+    from jd_parser.skill_matcher import known_skill_embeddings
+    from resume_matcher.matcher import taxonomy_embeddings
+
+    warm_up_models()
+    known_skill_embeddings()
+    taxonomy_embeddings()
+    share_embedding_tables()
+
+    # Tokenizer thread pools must not be inherited across fork()
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    # Objects that exist now are never collected, so GC never writes to their
+    # headers and never un-shares the pages they live on
+    gc.collect()
+    gc.freeze()
+
+
+# ========== Fork Workers ==========
+def _run_worker(launch, index, workers):
+    try:
+        import torch
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    except ImportError:
+        pass
+    launch(index)
+
+
+def serve_forked(launch, workers):
+    """
+    Preload, then fork `workers` processes and call launch(index) in each.
+    The parent only supervises: it forwards SIGINT/SIGTERM and frees the
+    shared embedding memory once every worker has exited.
+    """
+    preload()
+
+    children = []
+    for index in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                _run_worker(launch, index, workers)
+            except BaseException as e:
+                print(f"❌ Worker {index} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children.append(pid)
+        print(f"✅ Worker {index} started (pid {pid})")
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        for pid in children:
+            while True:
+                try:
+                    os.waitpid(pid, 0)
+                    break
+                except InterruptedError:
+                    continue
+                except ChildProcessError:
+                    break
+    finally:
+        release_embedding_tables(unlink=True)
@@ -0,0 +1,363 @@
+"""
+On-demand profiling of a single screening run.
+
+    SMARTSCREEN_PROFILE=1 python app.py            # profile every run
+    SMARTSCREEN_PROFILE_UI=1 python app.py         # show the hidden "Profile this run" checkbox
+    python -m utils.profiling single jd.pdf resumes.zip
+    python -m utils.profiling multi --jd a.pdf --jd b.pdf cv1.pdf cv2.docx
+
+A profiled run writes one directory under PROFILE_DIR:
+
+    stacks.collapsed   sampled stacks of the run's threads, one "frame;frame;… count"
+                       line each (flamegraph.pl, speedscope, inferno)
+    allocations.txt    tracemalloc top allocations at the peak and retained
+                       after the run
+    summary.txt        duration, sample count and the hottest functions
+
+tracemalloc slows allocation-heavy Python code down several times over,
+which skews the stack samples towards it; set SMARTSCREEN_PROFILE_MEMORY=0
+for a timing-only capture.
+
+Sampling covers the handler's thread and the pipeline threads it started
+(threads carrying an `owner` attribute, see StreamingPipeline.run), so time
+spent in pdfplumber, spaCy, skill normalisation or the sentence models shows
+up under the stage that called it, and concurrent sessions stay out of it.
+"""
+import argparse
+import functools
+import inspect
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# ========== Settings ==========
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_ENABLED = os.getenv("SMARTSCREEN_PROFILE", "0") == "1"
+PROFILE_UI = os.getenv("SMARTSCREEN_PROFILE_UI", "0") == "1"
+PROFILE_DIR = os.getenv("SMARTSCREEN_PROFILE_DIR", os.path.join(REPO_ROOT, ".profiles"))
+SAMPLE_INTERVAL_MS = float(os.getenv("SMARTSCREEN_PROFILE_INTERVAL_MS", "5"))
+PROFILE_MEMORY = os.getenv("SMARTSCREEN_PROFILE_MEMORY", "1") == "1"
+TRACEMALLOC_FRAMES = int(os.getenv("SMARTSCREEN_PROFILE_FRAMES", "10"))
+TOP_ALLOCATIONS = 30
+TOP_FUNCTIONS = 25
+PEAK_SNAPSHOT_GROWTH = 1.10   # re-snapshot once traced memory is 10% above the last peak snapshot
+PEAK_SNAPSHOT_EVERY = 1.0     # …but at most once a second, snapshots are not free
+
+_WORKER_SUFFIX = re.compile(r"[-_]\d+$")
+_active = threading.local()
+# tracemalloc is process-wide: one profiled run at a time, others run unprofiled
+_profile_lock = threading.Lock()
+
+
+# ========== Stack Sampler ==========
+def _frame_label(code):
+    """(label, is_repo_code) for a code object."""
+    path = code.co_filename
+    in_repo = path.startswith(REPO_ROOT + os.sep)
+    if in_repo:
+        path = os.path.relpath(path, REPO_ROOT)
+    elif "site-packages" + os.sep in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames in the collapsed format
+    return f"{name} ({path}:{code.co_firstlineno})".replace(";", ","), in_repo
+
+
+class StackSampler:
+    """
+    Samples the stacks of one run each `interval` seconds from a daemon
+    thread and counts identical stacks: the `root` thread and every thread
+    whose `owner` chain leads back to it (all threads if root is None). The
+    root frame is the thread name with the worker number dropped, so the
+    workers of a pipeline stage fold into one tower. Also snapshots
+    tracemalloc as traced memory peaks.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL_MS / 1000, root=None):
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self.samples = 0
+        self.peak_snapshot = None
+        self.peak_snapshot_bytes = 0
+        self.repo_frames = set()
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label, in_repo = _frame_label(code)
+            self._labels[code] = label
+            if in_repo:
+                self.repo_frames.add(label)
+        return label
+
+    def _run_threads(self, threads):
+        """Idents of the root thread and the threads it (transitively) owns."""
+        if self.root is None:
+            return None
+        run = {self.root}
+        # Not-yet-started threads have no ident; skip them so None never joins the run.
+        owned = [(t.ident, getattr(t, "owner", None)) for t in threads
+                 if t.ident is not None]
+        grew = True
+        while grew:
+            grew = False
+            for ident, owner in owned:
+                if owner in run and ident not in run:
+                    run.add(ident)
+                    grew = True
+        return run
+
+    def _sample(self, own):
+        threads = threading.enumerate()
+        names = {t.ident: _WORKER_SUFFIX.sub("", t.name) for t in threads}
+        run = self._run_threads(threads)
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (run is not None and ident not in run):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _maybe_snapshot(self, last):
+        if not tracemalloc.is_tracing():
+            return last
+        current, _ = tracemalloc.get_traced_memory()
+        now = time.perf_counter()
+        if current > self.peak_snapshot_bytes * PEAK_SNAPSHOT_GROWTH and now - last >= PEAK_SNAPSHOT_EVERY:
+            self.peak_snapshot = tracemalloc.take_snapshot()
+            self.peak_snapshot_bytes = current
+            return now
+        return last
+
+    def _run(self):
+        own = threading.get_ident()
+        last_snapshot = 0.0
+        while not self._stop.wait(self.interval):
+            self._sample(own)
+            last_snapshot = self._maybe_snapshot(last_snapshot)
+
+
+# ========== Reports ==========
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def _allocation_lines(stats, limit=TOP_ALLOCATIONS):
+    lines = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        size = getattr(stat, "size_diff", stat.size)
+        count = getattr(stat, "count_diff", stat.count)
+        lines.append(f"{_mb(size):>10}  {count:>9} blocks  {frame.filename}:{frame.lineno}")
+    return lines
+
+
+def _traceback_lines(stats, limit=5):
+    lines = []
+    for rank, stat in enumerate(stats[:limit], 1):
+        lines.append(f"#{rank} {_mb(stat.size)} in {stat.count} blocks")
+        lines.extend("    " + line for line in stat.traceback.format(most_recent_first=True))
+    return lines
+
+
+def write_allocations(path, start, end, peak, peak_bytes, traced_peak):
+    lines = [
+        f"Traced memory peak: {_mb(traced_peak)}",
+        "tracemalloc is process-wide: allocations of concurrent sessions are included.",
+        "",
+    ]
+    if peak is not None:
+        peak = peak.filter_traces(_SNAPSHOT_FILTERS)
+        lines += [f"== Live allocations near the peak ({_mb(peak_bytes)} traced) =="]
+        lines += _allocation_lines(peak.statistics("lineno")) + [""]
+        lines += ["== Largest call paths near the peak =="]
+        lines += _traceback_lines(peak.statistics("traceback")) + [""]
+    end = end.filter_traces(_SNAPSHOT_FILTERS)
+    lines += ["== Retained after the run (growth since start) =="]
+    lines += _allocation_lines(end.compare_to(start.filter_traces(_SNAPSHOT_FILTERS), "lineno"))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def write_collapsed(path, stacks):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def function_times(stacks):
+    """(self, inclusive) sample counts per frame label over all collapsed stacks."""
+    own, inclusive = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")[1:]   # drop the thread-name root
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for frame in set(frames):
+            inclusive[frame] += count
+    return own, inclusive
+
+
+def write_summary(path, name, elapsed, sampler, traced_peak, error=None):
+    own, inclusive = function_times(sampler.stacks)
+    total = max(1, sum(sampler.stacks.values()))
+    threads = Counter()
+    for stack, count in sampler.stacks.items():
+        threads[stack.split(";", 1)[0]] += count
+
+    lines = [
+        f"Run: {name}",
+        f"Wall time: {elapsed:.2f}s",
+        f"Samples: {sampler.samples} every {sampler.interval * 1000:g} ms ({total} thread stacks)",
+        f"Traced memory peak: {_mb(traced_peak)}" if traced_peak else "Allocation tracing: off",
+    ]
+    if error is not None:
+        lines.append(f"Raised: {error!r}")
+    lines += ["", "== Threads (share of stacks) =="]
+    lines += [f"{count / total:>7.1%}  {thread}" for thread, count in threads.most_common()]
+    lines += ["", "== Hottest functions, self time =="]
+    lines += [f"{count / total:>7.1%}  {frame}" for frame, count in own.most_common(TOP_FUNCTIONS)]
+    lines += ["", "== Hottest repo functions, inclusive time =="]
+    repo = [(frame, count) for frame, count in inclusive.most_common() if frame in sampler.repo_frames]
+    lines += [f"{count / total:>7.1%}  {frame}" for frame, count in repo[:TOP_FUNCTIONS]]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+# ========== Profiled Runs ==========
+class ProfileRun:
+    """One profiled run; `directory` is known up front so handlers can mention it in their status."""
+
+    def __init__(self, name, root=PROFILE_DIR, memory=PROFILE_MEMORY):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.name = name
+        self.memory = memory
+        self.directory = os.path.join(root, f"{stamp}-{name}-{os.getpid()}")
+        self.sampler = StackSampler(root=threading.get_ident())
+        self._started_tracing = False
+
+    def __enter__(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._start_snapshot = tracemalloc.take_snapshot()
+        self._start = time.perf_counter()
+        self.sampler.start()
+        _active.run = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _active.run = None
+        elapsed = time.perf_counter() - self._start
+        self.sampler.stop()
+        traced_peak = 0
+        if self.memory:
+            end_snapshot = tracemalloc.take_snapshot()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            if self._started_tracing:
+                tracemalloc.stop()
+            write_allocations(
+                os.path.join(self.directory, "allocations.txt"), self._start_snapshot, end_snapshot,
+                self.sampler.peak_snapshot, self.sampler.peak_snapshot_bytes, traced_peak
+            )
+
+        write_collapsed(os.path.join(self.directory, "stacks.collapsed"), self.sampler.stacks)
+        write_summary(os.path.join(self.directory, "summary.txt"), self.name, elapsed, self.sampler, traced_peak, exc)
+        print(f"🧪 Profile of {self.name} ({elapsed:.2f}s) saved to {self.directory}")
+        return False
+
+
+def active_profile():
+    """The ProfileRun wrapping the current thread's handler call, or None."""
+    return getattr(_active, "run", None)
+
+
+def profile_note():
+    """Status-line note pointing at the profile being captured, or ''."""
+    run = active_profile()
+    return f"🧪 profile: {run.directory}" if run is not None else ""
+
+
+def profiled(name):
+    """
+    Decorator for a screening handler: the call is profiled when
+    SMARTSCREEN_PROFILE=1 or the handler's own `profile` argument is true.
+    The handler keeps its signature, so Gradio wiring is unchanged.
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            requested = PROFILE_ENABLED
+            if not requested and "profile" in signature.parameters:
+                requested = bool(signature.bind_partial(*args, **kwargs).arguments.get("profile"))
+            if not requested or not _profile_lock.acquire(blocking=False):
+                return fn(*args, **kwargs)
+            try:
+                with ProfileRun(name):
+                    return fn(*args, **kwargs)
+            finally:
+                _profile_lock.release()
+        return wrapper
+    return decorate
+
+
+# ========== CLI ==========
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.profiling", description=__doc__.split("\n\n")[0])
+    parser.add_argument("scenario", choices=("single", "multi"))
+    parser.add_argument("files", nargs="+", help="single: JD then resumes; multi: resumes (JDs via --jd)")
+    parser.add_argument("--jd", action="append", default=[], help="JD file for the multi scenario (repeatable)")
+    parser.add_argument("--time-budget", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    import app   # builds the UI without launching it
+
+    if args.scenario == "single":
+        if len(args.files) < 2:
+            parser.error("single needs a JD followed by at least one resume")
+        _, status, _ = app.compare_jd_multiple_resumes(args.files[0], args.files[1:], args.time_budget, profile=True)
+    else:
+        if not args.jd:
+            parser.error("multi needs at least one --jd")
+        _, status, _, _ = app.compare_multiple_jds_with_export(args.jd, args.files, args.time_budget, profile=True)
+    print(status)
+    return 0 if status.startswith("✅") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,28 @@
-import re
 from config.skills import ROLE_SYNONYMS
+from utils.artifact import get_artifact
+
+# ✅ ROLE_SYNONYMS order is the priority order
+_ROLE_ORDER = {role: i for i, role in enumerate(ROLE_SYNONYMS)}
+
+# Keyword → earliest role, the single lookahead alternation and the keyword
+# containment map are compiled once into the startup artifact
+_KEYWORD_ROLE, _KEYWORD_PATTERN, _CONTAINED = get_artifact()["role_keywords"]
+
 
 def auto_detect_role(jd_text: str) -> str:
     print("🔍 Running auto role detection...")
     jd_lower = jd_text.lower()
 
-    for role, keywords in ROLE_SYNONYMS.items():
-        for keyword in keywords:
-            pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-            if re.search(pattern, jd_lower):
-                print(f"✅ Matched via synonym: {keyword} → Role: {role}")
-                return role
+    best = None
+    for match in _KEYWORD_PATTERN.finditer(jd_lower):
+        for keyword in _CONTAINED[match.group(1)]:
+            role = _KEYWORD_ROLE[keyword]
+            if best is None or _ROLE_ORDER[role] < _ROLE_ORDER[best[1]]:
+                best = (keyword, role)
+
+    if best:
+        print(f"✅ Matched via synonym: {best[0]} → Role: {best[1]}")
+        return best[1]
 
     print("⚠️ No match via ROLE_SYNONYMS. Returning 'Others'")
     return "Others"